@@ -0,0 +1,157 @@
+"""Check the change point detector for false alarms on steady nights.
+
+A room cooling with a fixed coefficient is simulated for one night, clean, with
+sensor noise, with readings rounded to 0.1 °C as many sensors report them and
+with rounded readings reported only on change, at irregular times, as most
+Home Assistant sensors do, and fed through the engine with change detection
+on. A steady night must give no change point. The coefficient is then stepped
+mid-night, as an opened window would, and must be detected within the hour.
+
+Home Assistant is not needed, only the engine module is imported:
+
+    python benchmarks/change_points.py --hours 10 --coefficient 1e-5 5e-5
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(__file__), "..", "custom_components", "heat_transfer"
+    ),
+)
+
+# pylint: disable=wrong-import-position
+from engine import EstimatorType, HeatTransferEngine  # noqa: E402
+
+# Seconds a change point may lag the step in the coefficient.
+DETECTION_DELAY = 3600
+# Seconds between the readings of the outdoor sensor
+OUTDOOR_PERIOD = 300
+# Traces: name, standard deviation of the indoor noise and rounding, in kelvin,
+# and for indoor sensors reporting on change only, the fewest and most seconds
+# between two looks at the temperature.
+TRACES = (
+    ("clean", 0.0, 0.0, None),
+    ("noisy", 0.02, 0.0, None),
+    ("rounded", 0.0, 0.1, None),
+    ("on change", 0.0, 0.1, (20.0, 100.0)),
+    ("slow on change", 0.0, 0.1, (60.0, 600.0)),
+)
+
+
+def _night(
+    hours: float,
+    coefficient: float,
+    outdoor: float,
+    noise: float,
+    resolution: float,
+    on_change: tuple[float, float] | None,
+    step: tuple[float, float] | None = None,
+) -> list[tuple[int, float, float]]:
+    """Return the (channel, timestamp, value) readings of a cooling room.
+
+    The indoor sensor reports minutely or, on change, whenever it looks at
+    random intervals and finds its rounded value changed; the outdoor sensor
+    every OUTDOOR_PERIOD seconds.
+    """
+    rng = random.Random(0)
+    indoor = 20.0
+    readings = []
+    timestamp = 0.0
+    reported = None
+    while timestamp <= hours * 3600:
+        reading = indoor + rng.gauss(0, noise) if noise else indoor
+        if resolution:
+            reading = round(reading / resolution) * resolution
+        if not on_change or reading != reported:
+            readings.append((0, timestamp, reading))
+            reported = reading
+        interval = rng.uniform(*on_change) if on_change else 60.0
+        rate = step[1] if step and timestamp >= step[0] else coefficient
+        indoor += (outdoor - indoor) * (1 - math.exp(-rate * interval))
+        timestamp += interval
+    readings.extend(
+        (1, float(timestamp), outdoor)
+        for timestamp in range(0, int(hours * 3600) + 1, OUTDOOR_PERIOD)
+    )
+    readings.sort(key=lambda reading: reading[1])
+    return readings
+
+
+def _change_points(
+    estimator: str, readings: list[tuple[int, float, float]]
+) -> list[tuple[str, int, float]]:
+    """Return (stream, direction, timestamp) of every change point found."""
+    found = []
+    engine = HeatTransferEngine(
+        estimator=estimator,
+        change_detection=True,
+        on_change_point=lambda stream, direction, sample: found.append(
+            (stream, direction, sample[0])
+        ),
+    )
+    for channel, timestamp, value in readings:
+        engine.add_reading(channel, timestamp, value)
+    return found
+
+
+def main() -> int:
+    """Run the check and return 1 on a false or missed alarm."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=10)
+    parser.add_argument("--coefficient", type=float, nargs="+", default=[1e-5, 5e-5])
+    parser.add_argument("--outdoor", type=float, default=2.0)
+    args = parser.parse_args()
+
+    failed = False
+    for coefficient in args.coefficient:
+        step = (args.hours * 1800, coefficient * 3)
+        for estimator in EstimatorType:
+            if estimator is EstimatorType.DELTA_T:
+                # Change detection only runs on estimators of the coefficient.
+                continue
+            for name, noise, resolution, on_change in TRACES:
+                steady = _change_points(
+                    estimator,
+                    _night(
+                        args.hours,
+                        coefficient,
+                        args.outdoor,
+                        noise,
+                        resolution,
+                        on_change,
+                    ),
+                )
+                stepped = _change_points(
+                    estimator,
+                    _night(
+                        args.hours,
+                        coefficient,
+                        args.outdoor,
+                        noise,
+                        resolution,
+                        on_change,
+                        step,
+                    ),
+                )
+                detected = any(
+                    step[0] < timestamp <= step[0] + DETECTION_DELAY
+                    for _stream, _direction, timestamp in stepped
+                )
+                failed |= bool(steady) or not detected
+                print(
+                    f"k={coefficient:g} {estimator} {name}: {len(steady)} false "
+                    f"alarms on a steady night, step "
+                    f"{'detected' if detected else 'missed'}"
+                )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
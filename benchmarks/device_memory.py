@@ -0,0 +1,90 @@
+"""Measure the memory used per heat_transfer device.
+
+Devices are created without subscribing to Home Assistant and fed a night of
+aligned samples, so the figure covers the per-device state that grows with the
+number of rooms: aligner, estimator window, compute states and device info.
+
+Run from the repository root with Home Assistant installed:
+
+    python benchmarks/device_memory.py --devices 10000 --estimator regression
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import timedelta
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# pylint: disable=wrong-import-position
+from custom_components.heat_transfer.sensor import (  # noqa: E402
+    DeviceHeatTransfer,
+    EstimatorType,
+)
+
+# Bytes per device the integration is expected to stay under.
+MEMORY_BUDGET = {
+    EstimatorType.DELTA_T: 4096,
+    EstimatorType.REGRESSION: 8192,
+    EstimatorType.RLS: 4096,
+    EstimatorType.MULTIVARIATE_RLS: 4096,
+}
+
+
+async def _create_devices(count: int, estimator: str, samples: int) -> list:
+    devices = []
+    for index in range(count):
+        device = DeviceHeatTransfer(
+            hass=None,
+            name=f"Room {index}",
+            unique_id=f"room_{index}",
+            in_temp_sensor_entity=f"sensor.room_{index}_temperature",
+            out_temp_sensor_entity="sensor.outdoor_temperature",
+            should_poll=False,
+            scan_interval=timedelta(seconds=30),
+            estimator=estimator,
+        )
+        for sample in range(samples):
+            timestamp = sample * 60.0
+            await device.async_set_out_temp(5.0, timestamp)
+            await device.async_set_in_temp(21.0 - sample * 0.001, timestamp)
+        devices.append(device)
+    return devices
+
+
+def main() -> int:
+    """Run the benchmark and return 1 if the budget is exceeded."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--samples", type=int, default=480)
+    parser.add_argument(
+        "--estimator",
+        choices=[estimator.value for estimator in EstimatorType],
+        default=EstimatorType.REGRESSION.value,
+    )
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    devices = asyncio.run(_create_devices(args.devices, args.estimator, args.samples))
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    per_device = total / len(devices)
+    budget = MEMORY_BUDGET[EstimatorType(args.estimator)]
+    print(
+        f"{args.estimator}: {len(devices)} devices, {total / 1024:.0f} KiB total, "
+        f"{per_device:.0f} B per device (budget {budget} B)"
+    )
+    return 0 if per_device <= budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Measure how long importing the heat_transfer modules takes.
+
+Each module is imported in a fresh interpreter after the Home Assistant core
+modules every integration gets for free, so the figure is the cost this
+integration adds to startup. The engine is also imported on its own, without
+Home Assistant, as batch jobs load it. The modules newly
+loaded by each import are listed with --verbose.
+
+Run from the repository root with Home Assistant installed:
+
+    python benchmarks/import_time.py --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Imported by Home Assistant itself before any custom integration is loaded.
+PRELOADED = (
+    "homeassistant.config_entries",
+    "homeassistant.core",
+    "homeassistant.helpers.entity",
+    "homeassistant.helpers.event",
+)
+
+# Module, directory it is imported from and modules imported before it.
+MODULES = (
+    ("custom_components.heat_transfer", ROOT, PRELOADED),
+    ("custom_components.heat_transfer.sensor", ROOT, PRELOADED),
+    ("custom_components.heat_transfer.config_flow", ROOT, PRELOADED),
+    ("engine", os.path.join(ROOT, "custom_components", "heat_transfer"), ()),
+)
+
+_PROBE = """
+import importlib, json, sys, time
+sys.path.insert(0, {path!r})
+for name in {preloaded!r}:
+    importlib.import_module(name)
+before = set(sys.modules)
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(set(sys.modules) - before)}}))
+"""
+
+
+def _measure(module: str, path: str, preloaded: tuple[str, ...]) -> dict:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _PROBE.format(path=path, preloaded=preloaded, module=module),
+        ],
+        capture_output=True,
+        check=True,
+        cwd=ROOT,
+        text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    for module, path, preloaded in MODULES:
+        runs = [_measure(module, path, preloaded) for _ in range(args.repeat)]
+        median = statistics.median(run["seconds"] for run in runs) * 1000
+        loaded = runs[-1]["modules"]
+        print(f"{module}: {median:.1f} ms, {len(loaded)} modules loaded")
+        if args.verbose:
+            for name in loaded:
+                print(f"    {name}")
+
+
+if __name__ == "__main__":
+    main()
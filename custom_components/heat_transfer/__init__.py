@@ -12,22 +12,44 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME, Platform, SERVICE_RELOAD
 from homeassistant.core import Event, HomeAssistant, ServiceCall
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import discovery
+from homeassistant.helpers import device_registry, discovery
 from homeassistant.helpers.reload import async_reload_integration_platforms
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.loader import async_get_integration
 
-from .config_flow import get_value
 from .const import (
+    CONF_ADAPTIVE_SCAN_INTERVAL,
+    CONF_ARCHIVE,
+    CONF_BASE_TEMPERATURE,
+    CONF_CHANGE_DETECTION,
+    CONF_CLIMATE_ENTITY,
     CONF_ENABLED_SENSORS,
+    CONF_ESTIMATOR,
+    CONF_ESTIMATOR_WINDOW,
+    CONF_FORECAST_TIME,
+    CONF_FORGETTING_FACTOR,
+    CONF_HEATER_ENTITY,
     CONF_IN_T_SENSOR,
+    CONF_IRRADIANCE_ENTITY,
+    CONF_MAX_SCAN_INTERVAL,
     CONF_OUT_T_SENSOR,
     CONF_POLL,
+    CONF_RESAMPLE_METHOD,
+    CONF_ROOM_SENSORS,
+    CONF_SAMPLE_PERIOD,
     CONF_SCAN_INTERVAL,
+    CONF_SIGNIFICANT_CHANGE,
+    CONF_STATISTICS,
+    CONF_THERMAL_MASS,
+    CONF_WEATHER_ENTITY,
+    CONF_WIND_SPEED_ENTITY,
+    DATA_YAML_UNSUBSCRIBES,
+    DEFAULT_NAME,
     DOMAIN,
     LOGGER,
-    OPTIONS_SCHEMA,
 )
+from .helpers import get_value
+from .websocket_api import async_register_commands
 
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
@@ -40,10 +62,30 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         CONF_NAME: get_value(entry, CONF_NAME),
+        CONF_ADAPTIVE_SCAN_INTERVAL: get_value(entry, CONF_ADAPTIVE_SCAN_INTERVAL),
+        CONF_ARCHIVE: get_value(entry, CONF_ARCHIVE),
+        CONF_BASE_TEMPERATURE: get_value(entry, CONF_BASE_TEMPERATURE),
+        CONF_CHANGE_DETECTION: get_value(entry, CONF_CHANGE_DETECTION),
+        CONF_CLIMATE_ENTITY: get_value(entry, CONF_CLIMATE_ENTITY),
+        CONF_ESTIMATOR: get_value(entry, CONF_ESTIMATOR),
+        CONF_ESTIMATOR_WINDOW: get_value(entry, CONF_ESTIMATOR_WINDOW),
+        CONF_FORECAST_TIME: get_value(entry, CONF_FORECAST_TIME),
+        CONF_FORGETTING_FACTOR: get_value(entry, CONF_FORGETTING_FACTOR),
+        CONF_HEATER_ENTITY: get_value(entry, CONF_HEATER_ENTITY),
         CONF_IN_T_SENSOR: get_value(entry, CONF_IN_T_SENSOR),
+        CONF_IRRADIANCE_ENTITY: get_value(entry, CONF_IRRADIANCE_ENTITY),
+        CONF_MAX_SCAN_INTERVAL: get_value(entry, CONF_MAX_SCAN_INTERVAL),
         CONF_OUT_T_SENSOR: get_value(entry, CONF_OUT_T_SENSOR),
         CONF_POLL: get_value(entry, CONF_POLL),
+        CONF_RESAMPLE_METHOD: get_value(entry, CONF_RESAMPLE_METHOD),
+        CONF_ROOM_SENSORS: get_value(entry, CONF_ROOM_SENSORS),
+        CONF_SAMPLE_PERIOD: get_value(entry, CONF_SAMPLE_PERIOD),
         CONF_SCAN_INTERVAL: get_value(entry, CONF_SCAN_INTERVAL),
+        CONF_SIGNIFICANT_CHANGE: get_value(entry, CONF_SIGNIFICANT_CHANGE),
+        CONF_STATISTICS: get_value(entry, CONF_STATISTICS),
+        CONF_THERMAL_MASS: get_value(entry, CONF_THERMAL_MASS),
+        CONF_WEATHER_ENTITY: get_value(entry, CONF_WEATHER_ENTITY),
+        CONF_WIND_SPEED_ENTITY: get_value(entry, CONF_WIND_SPEED_ENTITY),
     }
     if get_value(entry, CONF_ENABLED_SENSORS):
         hass.data[DOMAIN][entry.entry_id][CONF_ENABLED_SENSORS] = get_value(
@@ -55,8 +97,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if entry.unique_id is None:
         # We have no unique_id yet, let's use backup.
         hass.config_entries.async_update_entry(entry, unique_id=entry.entry_id)
+    if get_value(entry, CONF_ROOM_SENSORS):
+        # Parent device the per-room devices are attached to via via_device.
+        device_registry.async_get(hass).async_get_or_create(
+            config_entry_id=entry.entry_id,
+            identifiers={(DOMAIN, entry.unique_id)},
+            name=get_value(entry, CONF_NAME),
+            manufacturer=DEFAULT_NAME,
+            model="Virtual Hub",
+        )
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
     return True
 
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
@@ -70,13 +121,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
     return unloaded
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
-
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the thermal_comfort integration."""
+    async_register_commands(hass)
     if DOMAIN in config:
         await _process_config(hass, config)
 
@@ -95,6 +142,10 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         if conf is None:
             return
 
+        # YAML devices have no config entry whose unload would stop them.
+        unsubscribes = hass.data.get(DOMAIN, {}).pop(DATA_YAML_UNSUBSCRIBES, [])
+        for unsubscribe in unsubscribes:
+            unsubscribe()
         await async_reload_integration_platforms(hass, DOMAIN, PLATFORMS)
 
         if DOMAIN in conf:
@@ -110,6 +161,10 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
 async def _process_config(hass: HomeAssistant, hass_config: ConfigType) -> None:
     """Process config."""
+    # Only needed for YAML configuration, so not imported on every startup.
+    # pylint: disable=import-outside-toplevel
+    from .schema import OPTIONS_SCHEMA
+
     for conf_section in hass_config[DOMAIN]:
         for platform_domain in PLATFORMS:
             if platform_domain in conf_section:
@@ -7,21 +7,64 @@ from homeassistant.components.input_number import (
 )
 from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
 from homeassistant.components.sensor import SensorDeviceClass
-from homeassistant.const import CONF_NAME, Platform
+from homeassistant.const import CONF_NAME, Platform, UnitOfTemperature
 from homeassistant.core import callback, HomeAssistant, State
 from homeassistant.helpers import entity_registry, selector
 import voluptuous as vol
 
 from .const import (
+    ADAPTIVE_SCAN_INTERVAL_DEFAULT,
+    ARCHIVE_DEFAULT,
+    BASE_TEMPERATURE_DEFAULT,
+    CHANGE_DETECTION_DEFAULT,
+    CONF_ADAPTIVE_SCAN_INTERVAL,
+    CONF_ARCHIVE,
+    CONF_BASE_TEMPERATURE,
+    CONF_CHANGE_DETECTION,
+    CONF_CLIMATE_ENTITY,
+    CONF_ESTIMATOR,
+    CONF_ESTIMATOR_WINDOW,
+    CONF_FORECAST_TIME,
+    CONF_FORGETTING_FACTOR,
+    CONF_HEATER_ENTITY,
     CONF_IN_T_SENSOR,
+    CONF_IRRADIANCE_ENTITY,
+    CONF_MAX_SCAN_INTERVAL,
     CONF_OUT_T_SENSOR,
+    CONF_POLL,
+    CONF_RESAMPLE_METHOD,
+    CONF_ROOM_SENSORS,
+    CONF_SAMPLE_PERIOD,
+    CONF_SCAN_INTERVAL,
+    CONF_SIGNIFICANT_CHANGE,
+    CONF_STATISTICS,
+    CONF_THERMAL_MASS,
+    CONF_WEATHER_ENTITY,
+    CONF_WIND_SPEED_ENTITY,
     DEFAULT_NAME,
     DOMAIN,
+    ESTIMATOR_DEFAULT,
+    ESTIMATOR_WINDOW_DEFAULT,
+    FORECAST_TIME_DEFAULT,
+    FORGETTING_FACTOR_DEFAULT,
     LOGGER,
+    MAX_SCAN_INTERVAL_DEFAULT,
+    POLL_DEFAULT,
+    RESAMPLE_METHOD_DEFAULT,
+    SAMPLE_PERIOD_DEFAULT,
+    SCAN_INTERVAL_DEFAULT,
+    SIGNIFICANT_CHANGE_DEFAULT,
+    STATISTICS_DEFAULT,
+    THERMAL_MASS_DEFAULT,
+    EstimatorType,
+    ResampleMethod,
+    SensorType,
 )
-from .sensor import (
-    SensorType
-)
+from .helpers import as_entity_list, get_value
+
+CLIMATE_DOMAIN = "climate"
+INPUT_BOOLEAN_DOMAIN = "input_boolean"
+WEATHER_DOMAIN = "weather"
 
 
 def get_sensors_by_device_class(
@@ -321,19 +364,225 @@ def get_sensors_by_device_class(
     return result
 
 
-def get_value(
-    config_entry: config_entries.ConfigEntry | None, param: str, default=None
-):
-    """Get current value for configuration parameter.
+def build_options_schema(
+    config_entry: config_entries.ConfigEntry | None,
+) -> dict:
+    """Build the fields only offered by the options flow.
 
-    :param config_entry: config_entries|None: config entry from Flow
-    :param param: str: parameter name for getting value
-    :param default: default value for parameter, defaults to None
-    :returns: parameter value, or default value or None
+    :param config_entry: config entry for getting current parameters or None
+    :return: Schema fields with default parameters
     """
-    if config_entry is not None:
-        return config_entry.options.get(param, config_entry.data.get(param, default))
-    return default
+    return {
+        vol.Required(
+            CONF_POLL, default=get_value(
+                config_entry,
+                CONF_POLL,
+                POLL_DEFAULT
+            ),
+        ): selector.BooleanSelector(),
+        vol.Required(
+            CONF_SCAN_INTERVAL, default=get_value(
+                config_entry,
+                CONF_SCAN_INTERVAL,
+                SCAN_INTERVAL_DEFAULT
+            ),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=1,
+                max=3600,
+                step=1,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_ADAPTIVE_SCAN_INTERVAL, default=get_value(
+                config_entry,
+                CONF_ADAPTIVE_SCAN_INTERVAL,
+                ADAPTIVE_SCAN_INTERVAL_DEFAULT
+            ),
+        ): selector.BooleanSelector(),
+        vol.Required(
+            CONF_MAX_SCAN_INTERVAL, default=get_value(
+                config_entry,
+                CONF_MAX_SCAN_INTERVAL,
+                MAX_SCAN_INTERVAL_DEFAULT
+            ),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=1,
+                max=86400,
+                step=1,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_SAMPLE_PERIOD, default=get_value(
+                config_entry,
+                CONF_SAMPLE_PERIOD,
+                SAMPLE_PERIOD_DEFAULT
+            ),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=10,
+                max=3600,
+                step=10,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_RESAMPLE_METHOD, default=get_value(
+                config_entry,
+                CONF_RESAMPLE_METHOD,
+                RESAMPLE_METHOD_DEFAULT
+            ),
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[method.value for method in ResampleMethod],
+            ),
+        ),
+        vol.Required(
+            CONF_ESTIMATOR, default=get_value(
+                config_entry,
+                CONF_ESTIMATOR,
+                ESTIMATOR_DEFAULT
+            ),
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[estimator.value for estimator in EstimatorType],
+            ),
+        ),
+        vol.Optional(
+            CONF_WIND_SPEED_ENTITY, description={
+                "suggested_value": get_value(config_entry, CONF_WIND_SPEED_ENTITY)
+            },
+        ): selector.EntitySelector(
+            selector.EntitySelectorConfig(
+                domain=SENSOR_DOMAIN,
+                device_class=SensorDeviceClass.WIND_SPEED,
+            ),
+        ),
+        vol.Optional(
+            CONF_IRRADIANCE_ENTITY, description={
+                "suggested_value": get_value(config_entry, CONF_IRRADIANCE_ENTITY)
+            },
+        ): selector.EntitySelector(
+            selector.EntitySelectorConfig(
+                domain=SENSOR_DOMAIN,
+                device_class=SensorDeviceClass.IRRADIANCE,
+            ),
+        ),
+        vol.Required(
+            CONF_ESTIMATOR_WINDOW, default=get_value(
+                config_entry,
+                CONF_ESTIMATOR_WINDOW,
+                ESTIMATOR_WINDOW_DEFAULT
+            ),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=2,
+                max=10080,
+                step=1,
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_FORGETTING_FACTOR, default=get_value(
+                config_entry,
+                CONF_FORGETTING_FACTOR,
+                FORGETTING_FACTOR_DEFAULT
+            ),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0.9,
+                max=1,
+                step=0.0001,
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Optional(
+            CONF_WEATHER_ENTITY, description={
+                "suggested_value": get_value(config_entry, CONF_WEATHER_ENTITY)
+            },
+        ): selector.EntitySelector(
+            selector.EntitySelectorConfig(domain=WEATHER_DOMAIN),
+        ),
+        vol.Required(
+            CONF_FORECAST_TIME, default=get_value(
+                config_entry,
+                CONF_FORECAST_TIME,
+                FORECAST_TIME_DEFAULT
+            ),
+        ): selector.TimeSelector(),
+        vol.Required(
+            CONF_BASE_TEMPERATURE, default=get_value(
+                config_entry,
+                CONF_BASE_TEMPERATURE,
+                BASE_TEMPERATURE_DEFAULT
+            ),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=-10,
+                max=30,
+                step=0.5,
+                unit_of_measurement=UnitOfTemperature.CELSIUS,
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_THERMAL_MASS, default=get_value(
+                config_entry,
+                CONF_THERMAL_MASS,
+                THERMAL_MASS_DEFAULT
+            ),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=1000000,
+                step=1,
+                unit_of_measurement="kJ/K",
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_STATISTICS, default=get_value(
+                config_entry,
+                CONF_STATISTICS,
+                STATISTICS_DEFAULT
+            ),
+        ): selector.BooleanSelector(),
+        vol.Required(
+            CONF_SIGNIFICANT_CHANGE, default=get_value(
+                config_entry,
+                CONF_SIGNIFICANT_CHANGE,
+                SIGNIFICANT_CHANGE_DEFAULT
+            ),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0,
+                max=100,
+                step=0.5,
+                unit_of_measurement="%",
+                mode=selector.NumberSelectorMode.BOX,
+            ),
+        ),
+        vol.Required(
+            CONF_ARCHIVE, default=get_value(
+                config_entry,
+                CONF_ARCHIVE,
+                ARCHIVE_DEFAULT
+            ),
+        ): selector.BooleanSelector(),
+        vol.Required(
+            CONF_CHANGE_DETECTION, default=get_value(
+                config_entry,
+                CONF_CHANGE_DETECTION,
+                CHANGE_DETECTION_DEFAULT
+            ),
+        ): selector.BooleanSelector(),
+    }
 
 
 def build_schema(
@@ -364,10 +613,23 @@ def build_schema(
             )
         ): str,
         vol.Required(
-            CONF_IN_T_SENSOR, default=get_value(
+            CONF_IN_T_SENSOR, default=as_entity_list(get_value(
                 config_entry,
                 CONF_IN_T_SENSOR,
                 temperature_sensors[0]
+            )),
+        ): selector.EntitySelector(
+            selector.EntitySelectorConfig(
+                domain=[SENSOR_DOMAIN, INPUT_NUMBER_DOMAIN],
+                include_entities=temperature_sensors,
+                multiple=True,
+            ),
+        ),
+        vol.Required(
+            CONF_OUT_T_SENSOR, default=get_value(
+                config_entry,
+                CONF_OUT_T_SENSOR,
+                temperature_sensors[0]
             ),
         ): selector.EntitySelector(
             selector.EntitySelectorConfig(
@@ -375,6 +637,55 @@ def build_schema(
                 include_entities=temperature_sensors
             ),
         ),
+        vol.Optional(
+            CONF_CLIMATE_ENTITY, description={
+                "suggested_value": get_value(config_entry, CONF_CLIMATE_ENTITY)
+            },
+        ): selector.EntitySelector(
+            selector.EntitySelectorConfig(domain=CLIMATE_DOMAIN),
+        ),
+        vol.Optional(
+            CONF_HEATER_ENTITY, description={
+                "suggested_value": get_value(config_entry, CONF_HEATER_ENTITY)
+            },
+        ): selector.EntitySelector(
+            selector.EntitySelectorConfig(
+                domain=[Platform.SWITCH, INPUT_BOOLEAN_DOMAIN]
+            ),
+        ),
+    })
+    if config_entry is not None:
+        schema = schema.extend(build_options_schema(config_entry))
+    return schema
+
+
+def build_multi_room_schema(
+    config_entry: config_entries.ConfigEntry | None,
+    hass: HomeAssistant,
+) -> vol.Schema:
+    """Build configuration schema for one outdoor sensor shared by many rooms.
+
+    :param config_entry: config entry for getting current parameters or None
+    :param hass: Home Assistant instance
+    :return: Configuration schema with default parameters
+    """
+    temperature_sensors = get_sensors_by_device_class(
+        hass,
+        SensorDeviceClass.TEMPERATURE,
+        False,
+    )
+
+    if not temperature_sensors:
+        return None
+
+    schema = vol.Schema({
+        vol.Required(
+            CONF_NAME, default=get_value(
+                config_entry,
+                CONF_NAME,
+                DEFAULT_NAME
+            )
+        ): str,
         vol.Required(
             CONF_OUT_T_SENSOR, default=get_value(
                 config_entry,
@@ -387,7 +698,22 @@ def build_schema(
                 include_entities=temperature_sensors
             ),
         ),
+        vol.Required(
+            CONF_ROOM_SENSORS, default=get_value(
+                config_entry,
+                CONF_ROOM_SENSORS,
+                []
+            ),
+        ): selector.EntitySelector(
+            selector.EntitySelectorConfig(
+                domain=[SENSOR_DOMAIN, INPUT_NUMBER_DOMAIN],
+                include_entities=temperature_sensors,
+                multiple=True,
+            ),
+        ),
     })
+    if config_entry is not None:
+        schema = schema.extend(build_options_schema(config_entry))
     return schema
 
 
@@ -407,6 +733,16 @@ class HeatTransferFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         user_input: dict | None = None,
     ) -> config_entries.FlowResult:
         """Handle a flow initialized by the user."""
+        return self.async_show_menu(
+            step_id="user",
+            menu_options=["room", "multi_room"],
+        )
+
+    async def async_step_room(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.FlowResult:
+        """Handle a single indoor / outdoor sensor pair."""
         errors = {}
         if user_input is not None:
             if not(errors := validate_input(self.hass, user_input)):
@@ -418,14 +754,37 @@ class HeatTransferFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         if schema is None:
             return self.async_abort(reason="no_sensors")
         return self.async_show_form(
-            step_id="user",
+            step_id="room",
+            data_schema=schema,
+            errors=errors,
+        )
+
+    async def async_step_multi_room(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.FlowResult:
+        """Handle one outdoor sensor shared by several rooms."""
+        errors = {}
+        if user_input is not None:
+            if not(errors := validate_input(self.hass, user_input)):
+                return self.async_create_entry(
+                    title=user_input[CONF_NAME],
+                    data=user_input,
+                )
+        schema = build_multi_room_schema(config_entry=None, hass=self.hass)
+        if schema is None:
+            return self.async_abort(reason="no_sensors")
+        return self.async_show_form(
+            step_id="multi_room",
             data_schema=schema,
             errors=errors,
         )
 
     async def _set_unique_id(self, user_input: dict):
         ent_reg = entity_registry.async_get(self.hass)
-        in_t_sensor = ent_reg.async_get(user_input[CONF_IN_T_SENSOR])
+        in_t_sensor = ent_reg.async_get(
+            as_entity_list(user_input[CONF_IN_T_SENSOR])[0]
+        )
         out_t_sensor = ent_reg.async_get(user_input[CONF_OUT_T_SENSOR])
         LOGGER.debug("Going to use in_t_sensor %s", in_t_sensor)
         LOGGER.debug("Going to use out_t_sensor %s", out_t_sensor)
@@ -450,15 +809,25 @@ def validate_input(hass: HomeAssistant, user_input: dict) -> dict:
     :returns: dict with error.
     """
     result = {}
-    for conf in [
-            CONF_IN_T_SENSOR,
-            CONF_OUT_T_SENSOR,
-        ]:
-        if user_input is not None:
-            input_data = user_input.get(conf, None)
-            if (input_data is not None
-                    and hass.states.get(input_data)) is None:
-                result["base"] = "temperature_not_found"
+    if user_input is not None and CONF_IN_T_SENSOR in user_input:
+        in_sensors = as_entity_list(user_input[CONF_IN_T_SENSOR])
+        if not in_sensors:
+            result["base"] = "no_in_sensors"
+        elif any(hass.states.get(entity_id) is None
+                 for entity_id in in_sensors):
+            result["base"] = "temperature_not_found"
+    if user_input is not None:
+        input_data = user_input.get(CONF_OUT_T_SENSOR, None)
+        if (input_data is not None
+                and hass.states.get(input_data)) is None:
+            result["base"] = "temperature_not_found"
+    if user_input is not None and CONF_ROOM_SENSORS in user_input:
+        room_sensors = user_input[CONF_ROOM_SENSORS]
+        if not room_sensors:
+            result["base"] = "no_rooms"
+        elif any(hass.states.get(entity_id) is None
+                 for entity_id in room_sensors):
+            result["base"] = "temperature_not_found"
     return result
 
 
@@ -481,11 +850,18 @@ class HeatTransferOptionsFlow(config_entries.OptionsFlow):
             if not(errors := validate_input(self.hass, user_input)):
                 return self.async_create_entry(title="", data=user_input)
 
-        return self.async_show_form(
-            step_id="init",
-            data_schema=build_schema(
+        if get_value(self.config_entry, CONF_ROOM_SENSORS):
+            schema = build_multi_room_schema(
                 config_entry=self.config_entry,
                 hass=self.hass,
-            ),
+            )
+        else:
+            schema = build_schema(
+                config_entry=self.config_entry,
+                hass=self.hass,
+            )
+        return self.async_show_form(
+            step_id="init",
+            data_schema=schema,
             errors=errors,
         )
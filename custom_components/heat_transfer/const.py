@@ -1,10 +1,38 @@
 """Constants for heat_transfer."""
 from logging import Logger, getLogger
 
-from homeassistant.components.sensor import SensorEntityDescription
+from homeassistant.backports.enum import StrEnum
 from homeassistant.exceptions import HomeAssistantError
-import homeassistant.helpers.config_validation as cv
-import voluptuous as vol
+
+# The engine can't import Home Assistant or this module, so the constants and
+# enums it needs are defined there and re-exported here.
+from .engine import (  # noqa: F401
+    ADAPTIVE_COEFFICIENT_RATE,
+    ADAPTIVE_DELTA_T_RATE,
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVE_BOOTSTRAP_MAX,
+    ARCHIVE_MAX_BYTES,
+    BASE_TEMPERATURE_DEFAULT,
+    CHANGE_POINT_CLIP,
+    CHANGE_POINT_DRIFT,
+    CHANGE_POINT_SPAN,
+    CHANGE_POINT_THRESHOLD,
+    CHANGE_POINT_WARMUP,
+    ESTIMATOR_DEFAULT,
+    ESTIMATOR_WINDOW_DEFAULT,
+    FORGETTING_FACTOR_DEFAULT,
+    FUSION_TIME_CONSTANT,
+    NIGHT_END_HOUR,
+    NIGHT_START_HOUR,
+    RESAMPLE_METHOD_DEFAULT,
+    SAMPLE_PERIOD_DEFAULT,
+    SAMPLE_STALE_AFTER,
+    SEGMENT_MAX_SAMPLES,
+    SEGMENT_MIN_SAMPLES,
+    SEGMENT_SETTLE,
+    EstimatorType,
+    ResampleMethod,
+)
 
 LOGGER: Logger = getLogger(__package__)
 
@@ -12,39 +40,84 @@ DOMAIN = "heat_transfer"
 NAME = "Heat Transfer"
 VERSION = "0.0.0"
 
+ARCHIVE_DEFAULT = False
 ATTR_COEFFICIENT = "coefficient"
+ADAPTIVE_SCAN_INTERVAL_DEFAULT = False
+CHANGE_DETECTION_DEFAULT = False
+CONF_ADAPTIVE_SCAN_INTERVAL = "adaptive_scan_interval"
+CONF_ARCHIVE = "archive"
+CONF_BASE_TEMPERATURE = "base_temperature"
+CONF_CHANGE_DETECTION = "change_detection"
+CONF_CLIMATE_ENTITY = "climate_entity_id"
 CONF_ENABLED_SENSORS = "enabled_sensors"
+CONF_ESTIMATOR = "estimator"
+CONF_ESTIMATOR_WINDOW = "estimator_window"
+CONF_FORECAST_TIME = "forecast_time"
+CONF_FORGETTING_FACTOR = "forgetting_factor"
+CONF_HEATER_ENTITY = "heater_entity_id"
 CONF_IN_T_SENSOR = "in_temp_sensor_entity_id"
+CONF_IRRADIANCE_ENTITY = "irradiance_entity_id"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
 CONF_OUT_T_SENSOR = "out_temp_sensor_entity_id"
 CONF_POLL = "poll"
+CONF_RESAMPLE_METHOD = "resample_method"
+CONF_ROOM_SENSORS = "room_sensor_entity_ids"
+CONF_SAMPLE_PERIOD = "sample_period"
 CONF_SCAN_INTERVAL = "scan_interval"
 CONF_SENSOR_TYPES = "sensor_types"
+CONF_SIGNIFICANT_CHANGE = "significant_change"
+CONF_STATISTICS = "statistics"
+CONF_THERMAL_MASS = "thermal_mass"
+CONF_WEATHER_ENTITY = "weather_entity_id"
+CONF_WIND_SPEED_ENTITY = "wind_speed_entity_id"
+DATA_DEVICES = "devices"
+# Unsubscribe callbacks of YAML configured devices, called on reload
+DATA_YAML_UNSUBSCRIBES = "yaml_unsubscribes"
 DEFAULT_NAME = "Heat transfer coefficient"
 DISPLAY_PRECISION = 2
+EVENT_CHANGE_POINT = f"{DOMAIN}_change_point"
+# Local time of day the indoor temperature is forecast for, and the relative
+# coefficient change after which the forecast is recomputed
+FORECAST_RECOMPUTE_CHANGE = 0.01
+FORECAST_TIME_DEFAULT = "07:00:00"
+MAX_SCAN_INTERVAL_DEFAULT = 900
 POLL_DEFAULT = False
+# Rooms listed by the ranking sensor of a multi-room entry
+RANKING_SIZE = 5
 SCAN_INTERVAL_DEFAULT = 30
+SIGNIFICANT_CHANGE_DEFAULT = 5
+STATISTICS_DEFAULT = False
+# Thermal mass of a room in kJ/K, 0 for no heat loss energy sensor
+THERMAL_MASS_DEFAULT = 0
+# Decimals the totals are written with. They grow with every sample, and each
+# written step is a recorder row, so steps of 0.1 keep it to a few an hour.
+TOTAL_PRECISION = 1
+# Most samples in a websocket snapshot before and after downsampling, and the
+# fewest seconds between two websocket updates
+WEBSOCKET_HISTORY = 1440
+WEBSOCKET_MAX_POINTS = 500
+WEBSOCKET_THROTTLE = 5
 
-ENTITY_DESCRIPTIONS = (
-    SensorEntityDescription(
-        key="heat_transfer",
-        name="Heat transfer coefficient Sensor",
-        icon="mdi:thermometer-lines",
-    ),
-)
+class SensorType(StrEnum):
+    """Sensor type enum."""
 
-SENSOR_OPTIONS_SCHEMA = vol.Schema(
-    {
-        vol.Optional(CONF_POLL): cv.boolean,
-        vol.Optional(CONF_SCAN_INTERVAL): cv.time_period,
-        vol.Optional(CONF_SENSOR_TYPES): cv.ensure_list,
-    },
-    extra=vol.REMOVE_EXTRA,
-)
+    HEAT_TRANSFER_COEFFICIENT = "heat_transfer_coefficient"
+    INDOOR_TEMPERATURE_FORECAST = "indoor_temperature_forecast"
+    HEATING_DEGREE_DAYS = "heating_degree_days"
+    HEAT_LOSS_ENERGY = "heat_loss_energy"
 
-OPTIONS_SCHEMA = vol.Schema({}).extend(
-    SENSOR_OPTIONS_SCHEMA.schema,
-    extra=vol.REMOVE_EXTRA,
-)
+    def to_name(self) -> str:
+        """Return the title of the sensor type."""
+        return self.value.replace("_", " ").capitalize()
+
+    @classmethod
+    def from_string(cls, string: str) -> "SensorType":
+        """Return the sensor type from string."""
+        if string in list(cls):
+            return cls(string)
+        raise ValueError(
+            f"Unknown sensor type: {string}. Please check https://github.com/CJDumbleton/heat_transfer for valid options."
+            )
 
 class UnknownEntity(HomeAssistantError):
     """Error to indicate there is an unknown entity_id given."""
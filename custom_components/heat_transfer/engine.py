@@ -0,0 +1,1498 @@
+"""Core engine of heat_transfer: ingest, alignment, estimation and aggregation.
+
+Pure Python without Home Assistant, so the same code runs in the integration
+and in batch analysis, such as scripts/replay.py. It imports nothing from this
+package either, so it can be loaded on its own by putting this directory on
+sys.path and importing engine, without importing the integration.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from array import array
+import bisect
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone, tzinfo
+from enum import Enum
+import heapq
+from logging import Logger, getLogger
+import math
+import mmap
+import os
+import struct
+import threading
+
+LOGGER: Logger = getLogger(__name__)
+
+# Bytes after which a sample archive is rotated, flush size in samples and
+# the most archived samples replayed into an estimator on startup
+ARCHIVE_BATCH_SIZE = 60
+ARCHIVE_BOOTSTRAP_MAX = 10080
+ARCHIVE_MAX_BYTES = 8 * 1024 * 1024
+# Relative coefficient change and temperature difference change in K, per
+# minute, above which the adaptive scan interval drops back to its minimum
+ADAPTIVE_COEFFICIENT_RATE = 0.01
+ADAPTIVE_DELTA_T_RATE = 0.05
+# Outdoor temperature in celsius below which heating degree days accumulate
+BASE_TEMPERATURE_DEFAULT = 15.5
+# Two-sided CUSUM on z-scores: largest z-score, slack and alarm threshold in
+# standard deviations, span in samples of the exponentially weighted mean and
+# variance, and samples seen before any alarm
+CHANGE_POINT_CLIP = 4.0
+CHANGE_POINT_DRIFT = 0.5
+# Kelvin of temperature difference below which a sample's own coefficient is
+# mostly sensor noise and isn't checked for change points
+CHANGE_POINT_MIN_DELTA_T = 1.0
+CHANGE_POINT_SPAN = 240
+CHANGE_POINT_THRESHOLD = 8.0
+CHANGE_POINT_WARMUP = 30
+ESTIMATOR_DEFAULT = "delta_t"
+ESTIMATOR_WINDOW_DEFAULT = 240
+FORGETTING_FACTOR_DEFAULT = 0.999
+# Seconds over which the weight of a fused indoor sensor's reading decays by e,
+# long against report intervals so that sensors disagreeing by a kelvin or two
+# don't make the fused series jump as they take turns to report
+FUSION_TIME_CONSTANT = 3600
+# Local hours of the night the nightly statistics cover, see README
+NIGHT_END_HOUR = 4
+NIGHT_START_HOUR = 0
+RESAMPLE_METHOD_DEFAULT = "linear"
+SAMPLE_PERIOD_DEFAULT = 60
+# Seconds without an update after which a sensor is assumed to hold its value
+SAMPLE_STALE_AFTER = 600
+# Seconds after heating stops before a cooling segment opens, and the fewest
+# and most aligned samples in one segment
+SEGMENT_MAX_SAMPLES = 1440
+SEGMENT_MIN_SAMPLES = 30
+SEGMENT_SETTLE = 1800
+
+IN_CHANNEL = 0
+OUT_CHANNEL = 1
+RLS_INITIAL_COVARIANCE = 1.0
+ARCHIVE_RECORD = struct.Struct("<ddd")
+STATISTICS_HOURLY = "hourly"
+STATISTICS_NIGHTLY = "nightly"
+STREAM_COEFFICIENT = "coefficient"
+STREAM_SAMPLE_COEFFICIENT = "sample_coefficient"
+
+
+class ResampleMethod(str, Enum):
+    """How sensor readings are resampled onto the sample grid."""
+
+    LINEAR = "linear"
+    HOLD = "hold"
+
+    def __str__(self) -> str:
+        """Return the value, as a StrEnum does."""
+        return str(self.value)
+
+
+class EstimatorType(str, Enum):
+    """Backend estimating the heat transfer coefficient."""
+
+    DELTA_T = "delta_t"
+    REGRESSION = "regression"
+    RLS = "rls"
+    MULTIVARIATE_RLS = "multivariate_rls"
+
+    def __str__(self) -> str:
+        """Return the value, as a StrEnum does."""
+        return str(self.value)
+
+
+class StreamAligner:
+    """Align asynchronous sensor streams onto a uniform time grid.
+
+    Each channel keeps only the readings the grid has not yet passed, so every
+    reading is appended and dropped once and every grid point is produced once:
+    O(1) amortized work per reading. Plain lists are used rather than deques as
+    a channel rarely holds more than two readings and an empty deque costs over
+    ten times as much memory as an empty list. A grid point is produced as soon
+    as every one of the first channels has a reading at or after it. A channel
+    silent for longer than stale_after is assumed to hold its last value, which
+    is what Home Assistant sensors reporting only on change mean. The optional
+    channels after them, such as regressors, never hold back the grid: they
+    hold their last value and read as 0 until their first reading.
+    """
+
+    __slots__ = (
+        "_points",
+        "_required",
+        "_period",
+        "_linear",
+        "_stale_after",
+        "_next",
+        "_latest",
+    )
+
+    def __init__(
+        self,
+        channels: int = 2,
+        period: float = SAMPLE_PERIOD_DEFAULT,
+        method: ResampleMethod = ResampleMethod.LINEAR,
+        stale_after: float = SAMPLE_STALE_AFTER,
+        optional: int = 0,
+    ) -> None:
+        """Initialize the aligner."""
+        self._points = [[] for _ in range(channels + optional)]
+        self._required = channels
+        self._period = period
+        self._linear = method == ResampleMethod.LINEAR
+        self._stale_after = stale_after
+        self._next = None
+        self._latest = None
+
+    def add(
+        self, channel: int, timestamp: float, value: float
+    ) -> list[tuple[float, ...]]:
+        """Add a reading and return the grid samples it completes.
+
+        :param channel: index of the stream the reading belongs to
+        :param timestamp: POSIX timestamp of the reading
+        :param value: the reading
+        :returns: list of (timestamp, value of channel 0, value of channel 1, ...)
+        """
+        points = self._points[channel]
+        if points and timestamp <= points[-1][0]:
+            if timestamp == points[-1][0]:
+                points[-1] = (timestamp, value)
+            # Out of order readings are dropped.
+            return []
+        points.append((timestamp, value))
+        if self._latest is None or timestamp > self._latest:
+            self._latest = timestamp
+        return self._emit()
+
+    def reset(self) -> None:
+        """Forget all readings."""
+        for points in self._points:
+            points.clear()
+        self._next = None
+        self._latest = None
+
+    def _emit(self) -> list[tuple[float, ...]]:
+        required = self._points[: self._required]
+        if not all(required):
+            return []
+        period = self._period
+        if self._next is None:
+            first = max(points[0][0] for points in required)
+            self._next = math.ceil(first / period) * period
+        frontier = min(
+            self._latest
+            if self._latest - points[-1][0] >= self._stale_after
+            else points[-1][0]
+            for points in required
+        )
+        if frontier - self._next > 2 * self._stale_after:
+            # Resume close to now after an outage instead of replaying it. A
+            # channel going stale moves the frontier on by stale_after at
+            # once, and skipping grid points then would leave out the step
+            # its next reading makes.
+            self._next = math.ceil((frontier - self._stale_after) / period) * period
+        samples = []
+        while self._next <= frontier:
+            grid = self._next
+            samples.append(
+                (
+                    grid,
+                    *(
+                        self._value_at(points, grid) if points else 0.0
+                        for points in self._points
+                    ),
+                )
+            )
+            self._next = grid + period
+        return samples
+
+    def _value_at(self, points: list, grid: float) -> float:
+        passed = 0
+        while passed + 1 < len(points) and points[passed + 1][0] <= grid:
+            passed += 1
+        if passed:
+            del points[:passed]
+        start, value = points[0]
+        if self._linear and len(points) > 1 and start < grid:
+            end, end_value = points[1]
+            return value + (end_value - value) * (grid - start) / (end - start)
+        return value
+
+
+class TemperatureFusion:
+    """Fuse several sensors measuring one temperature into a single series.
+
+    The fused value is the mean of the latest reading of every member weighted
+    by exp((t - now) / time_constant), where t is when the member last
+    reported, so members reporting recently count for more. A silent member
+    keeps its last value, as sensors only report changes, until it is
+    discarded as unavailable. The exp(-now / time_constant) factor is common
+    to all weights and cancels, so the weighted sums are kept relative to a
+    fixed anchor time and each update only swaps one member's term: O(1). The
+    anchor is moved forward, and the sums recomputed, before the weights could
+    overflow.
+    """
+
+    __slots__ = (
+        "_time_constant",
+        "_members",
+        "_anchor",
+        "_weight_sum",
+        "_value_sum",
+    )
+
+    # Largest exponent kept before moving the anchor; exp(600) is about 1e260.
+    _MAX_EXPONENT = 600.0
+
+    def __init__(self, time_constant: float = FUSION_TIME_CONSTANT) -> None:
+        """Initialize the fusion."""
+        self._time_constant = time_constant
+        self._members: dict[str, tuple[float, float]] = {}
+        self._anchor = None
+        self._weight_sum = 0.0
+        self._value_sum = 0.0
+
+    def add(self, member: str, timestamp: float, value: float) -> float:
+        """Add a member reading and return the fused value."""
+        if self._anchor is None:
+            self._anchor = timestamp
+        elif (timestamp - self._anchor) / self._time_constant > self._MAX_EXPONENT:
+            self._rebase(timestamp)
+        if (previous := self._members.get(member)) is not None:
+            self._remove(*previous)
+        self._members[member] = (timestamp, value)
+        weight = self._weight(timestamp)
+        self._weight_sum += weight
+        self._value_sum += weight * value
+        return self._value_sum / self._weight_sum
+
+    def discard(self, member: str) -> None:
+        """Leave out an unavailable member until it reports again."""
+        if (previous := self._members.pop(member, None)) is None:
+            return
+        if self._members:
+            self._remove(*previous)
+        else:
+            self._anchor = None
+            self._weight_sum = 0.0
+            self._value_sum = 0.0
+
+    def _weight(self, timestamp: float) -> float:
+        return math.exp((timestamp - self._anchor) / self._time_constant)
+
+    def _remove(self, timestamp: float, value: float) -> None:
+        weight = self._weight(timestamp)
+        self._weight_sum -= weight
+        self._value_sum -= weight * value
+
+    def _rebase(self, anchor: float) -> None:
+        # Recomputing also clears the rounding error the subtractions left.
+        self._anchor = anchor
+        self._weight_sum = 0.0
+        self._value_sum = 0.0
+        for timestamp, value in self._members.values():
+            weight = self._weight(timestamp)
+            self._weight_sum += weight
+            self._value_sum += weight * value
+
+
+class DeltaTEstimator:
+    """Outdoor minus indoor temperature of the latest sample."""
+
+    __slots__ = ("value",)
+
+    # Most recent samples needed to rebuild the estimate from history.
+    bootstrap_size = 1
+
+    def __init__(self) -> None:
+        """Initialize the estimator."""
+        self.value = None
+
+    def update(
+        self, timestamp: float, in_temp: float, out_temp: float, *regressors: float
+    ) -> None:
+        """Add an aligned sample, ignoring any extra regressors."""
+        self.value = out_temp - in_temp
+
+    def start_segment(self) -> None:
+        """Mark the next sample as not following on from the previous one."""
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        self.value = None
+
+
+class NewtonEstimator(ABC):
+    """Base class for estimators of k in dT_in/dt = k (T_out - T_in).
+
+    Consecutive aligned samples are turned into one observation of the
+    indoor rate of change y against the mean temperature difference x.
+    """
+
+    __slots__ = ("value", "_previous")
+
+    def __init__(self) -> None:
+        """Initialize the estimator."""
+        self.value = None
+        self._previous = None
+
+    def update(
+        self, timestamp: float, in_temp: float, out_temp: float, *regressors: float
+    ) -> float | None:
+        """Add an aligned sample, ignoring any extra regressors.
+
+        :returns: the coefficient observed in this sample alone, y / x, or None
+            if the sample gives no observation
+        """
+        previous = self._previous
+        self._previous = (timestamp, in_temp, out_temp)
+        if previous is None or timestamp <= previous[0]:
+            return None
+        x = (out_temp + previous[2] - in_temp - previous[1]) / 2
+        y = (in_temp - previous[1]) / (timestamp - previous[0])
+        self._observe(x, y)
+        return y / x if x else None
+
+    def start_segment(self) -> None:
+        """Mark the next sample as not following on from the previous one."""
+        self._previous = None
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        self.value = None
+        self._previous = None
+
+    @abstractmethod
+    def _observe(self, x: float | Sequence[float], y: float) -> float | None:
+        """Fit one observation y of dT_in/dt against x.
+
+        x is dT, or the vector of dT and the other terms for estimators
+        fitting more than k, which return the innovation.
+        """
+
+
+class WindowedRegressionEstimator(NewtonEstimator):
+    """Least squares fit of k through the origin over the last window samples.
+
+    Observations are kept as interleaved x, y doubles in a fixed size ring
+    buffer. Running sums are updated as observations enter and leave the window
+    and recomputed exactly once per window to stop rounding errors accumulating.
+    """
+
+    __slots__ = (
+        "_window",
+        "_size",
+        "_count",
+        "_head",
+        "_sum_xy",
+        "_sum_xx",
+        "_evictions",
+    )
+
+    def __init__(self, window: int = ESTIMATOR_WINDOW_DEFAULT) -> None:
+        """Initialize the estimator."""
+        super().__init__()
+        self._size = window
+        self._window = array("d", bytes(16 * window))
+        self._count = 0
+        self._head = 0
+        self._sum_xy = 0.0
+        self._sum_xx = 0.0
+        self._evictions = 0
+
+    @property
+    def bootstrap_size(self) -> int:
+        """Return the most recent samples needed to rebuild the estimate."""
+        return self._size + 1
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        super().reset()
+        self._count = 0
+        self._head = 0
+        self._sum_xy = 0.0
+        self._sum_xx = 0.0
+        self._evictions = 0
+
+    def _observe(self, x: float, y: float) -> None:
+        window = self._window
+        index = 2 * self._head
+        if self._count == self._size:
+            old_x = window[index]
+            self._sum_xy -= old_x * window[index + 1]
+            self._sum_xx -= old_x * old_x
+            self._evictions += 1
+        else:
+            self._count += 1
+        window[index] = x
+        window[index + 1] = y
+        self._head = (self._head + 1) % self._size
+        if self._evictions >= self._size:
+            xs = window[0::2]
+            self._sum_xy = math.fsum(map(float.__mul__, xs, window[1::2]))
+            self._sum_xx = math.fsum(map(float.__mul__, xs, xs))
+            self._evictions = 0
+        else:
+            self._sum_xy += x * y
+            self._sum_xx += x * x
+        if self._sum_xx > 1e-9:
+            self.value = self._sum_xy / self._sum_xx
+
+
+class RecursiveLeastSquaresEstimator(NewtonEstimator):
+    """Scalar recursive least squares with exponential forgetting.
+
+    Equivalent to a scalar Kalman filter on a random walk k. Tracks k in O(1)
+    memory without any sample window.
+    """
+
+    __slots__ = ("_forgetting_factor", "_k", "_p")
+
+    def __init__(
+        self, forgetting_factor: float = FORGETTING_FACTOR_DEFAULT
+    ) -> None:
+        """Initialize the estimator."""
+        super().__init__()
+        self._forgetting_factor = forgetting_factor
+        self._k = 0.0
+        self._p = RLS_INITIAL_COVARIANCE
+
+    @property
+    def bootstrap_size(self) -> int:
+        """Return the most recent samples needed to rebuild the estimate.
+
+        Samples older than five time constants of the forgetting factor carry
+        less than 1% of the weight.
+        """
+        if self._forgetting_factor >= 1:
+            return ARCHIVE_BOOTSTRAP_MAX
+        return min(
+            ARCHIVE_BOOTSTRAP_MAX, math.ceil(5 / (1 - self._forgetting_factor))
+        )
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        super().reset()
+        self._k = 0.0
+        self._p = RLS_INITIAL_COVARIANCE
+
+    def _observe(self, x: float, y: float) -> None:
+        p_x = self._p * x
+        gain = p_x / (self._forgetting_factor + x * p_x)
+        self._k += gain * (y - self._k * x)
+        self._p = (self._p - gain * p_x) / self._forgetting_factor
+        self.value = self._k
+
+
+class MultivariateRecursiveLeastSquaresEstimator(NewtonEstimator):
+    """Recursive least squares of dT_in/dt on conduction, wind and solar terms.
+
+    Fits dT_in/dt = k dT + k_wind wind dT + g irradiance, where dT is
+    T_out - T_in, wind and irradiance being optional. Samples carry the wind
+    speed and then the irradiance after the temperatures, for whichever of the
+    two are used. With p <= 3 parameters the p x p covariance is kept as a flat
+    list and each update is O(p^2) without any sample window. The value is k,
+    the conduction coefficient with wind and solar gain separated out.
+    """
+
+    __slots__ = (
+        "_forgetting_factor",
+        "_wind_speed",
+        "_size",
+        "_theta",
+        "_covariance",
+    )
+
+    # The archive holds temperatures only, which this estimator can't use.
+    bootstrap_size = 0
+
+    def __init__(
+        self,
+        forgetting_factor: float = FORGETTING_FACTOR_DEFAULT,
+        wind_speed: bool = False,
+        irradiance: bool = False,
+    ) -> None:
+        """Initialize the estimator."""
+        super().__init__()
+        self._forgetting_factor = forgetting_factor
+        self._wind_speed = wind_speed
+        self._size = 1 + wind_speed + irradiance
+        self._reset_parameters()
+
+    def update(
+        self, timestamp: float, in_temp: float, out_temp: float, *regressors: float
+    ) -> float | None:
+        """Add an aligned sample with its wind speed and irradiance.
+
+        :returns: the coefficient observed in this sample alone, the prior k
+            plus the innovation over dT, or None if the sample gives no
+            observation
+        """
+        previous = self._previous
+        if len(regressors) < self._size - 1:
+            # Samples without regressors, e.g. from the archive, can't be used.
+            self._previous = None
+            return None
+        self._previous = (timestamp, in_temp, out_temp, *regressors)
+        if previous is None or timestamp <= previous[0]:
+            return None
+        delta_t = (out_temp + previous[2] - in_temp - previous[1]) / 2
+        phi = [delta_t]
+        phi.extend(
+            (regressor + previous[index]) / 2
+            for index, regressor in enumerate(regressors[: self._size - 1], 3)
+        )
+        if self._wind_speed:
+            phi[1] *= delta_t
+        k = self._theta[0]
+        error = self._observe(
+            phi, (in_temp - previous[1]) / (timestamp - previous[0])
+        )
+        return k + error / delta_t if delta_t else None
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        super().reset()
+        self._reset_parameters()
+
+    def _reset_parameters(self) -> None:
+        size = self._size
+        self._theta = [0.0] * size
+        self._covariance = [
+            RLS_INITIAL_COVARIANCE if row == column else 0.0
+            for row in range(size)
+            for column in range(size)
+        ]
+
+    def _observe(self, phi: list[float], y: float) -> float:
+        """Update the fit and return the innovation, its error before updating.
+
+        phi holds dT and the wind and solar terms, rather than dT alone.
+        """
+        size = self._size
+        covariance = self._covariance
+        p_phi = [
+            sum(covariance[row * size + column] * phi[column] for column in range(size))
+            for row in range(size)
+        ]
+        denominator = self._forgetting_factor + sum(map(float.__mul__, phi, p_phi))
+        gain = [value / denominator for value in p_phi]
+        error = y - sum(map(float.__mul__, self._theta, phi))
+        self._theta = [
+            theta + value * error for theta, value in zip(self._theta, gain)
+        ]
+        # P is symmetric, so P phi phi' P = p_phi p_phi'.
+        self._covariance = [
+            (covariance[row * size + column] - gain[row] * p_phi[column])
+            / self._forgetting_factor
+            for row in range(size)
+            for column in range(size)
+        ]
+        self.value = self._theta[0]
+        return error
+
+
+def create_estimator(
+    estimator_type: str,
+    window: int = ESTIMATOR_WINDOW_DEFAULT,
+    forgetting_factor: float = FORGETTING_FACTOR_DEFAULT,
+    wind_speed: bool = False,
+    irradiance: bool = False,
+):
+    """Return a new estimator of the given EstimatorType.
+
+    Only the multivariate estimator uses the wind speed and irradiance.
+    """
+    estimator_type = EstimatorType(estimator_type)
+    if estimator_type is EstimatorType.MULTIVARIATE_RLS:
+        return MultivariateRecursiveLeastSquaresEstimator(
+            float(forgetting_factor), wind_speed, irradiance
+        )
+    if estimator_type is EstimatorType.REGRESSION:
+        return WindowedRegressionEstimator(int(window))
+    if estimator_type is EstimatorType.RLS:
+        return RecursiveLeastSquaresEstimator(float(forgetting_factor))
+    return DeltaTEstimator()
+
+
+def replay_estimator(estimator, samples: Sequence[tuple[float, ...]]):
+    """Feed aligned samples to an estimator and return it."""
+    for sample in samples:
+        estimator.update(*sample)
+    return estimator
+
+
+@dataclass(slots=True)
+class StatisticsBucket:
+    """Running mean, min, max and count of the values in one period."""
+
+    start: float
+    count: int = 0
+    total: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    def add(self, value: float) -> None:
+        """Add a value to the bucket."""
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    @property
+    def mean(self) -> float:
+        """Return the mean of the values in the bucket."""
+        return self.total / self.count
+
+
+class StatisticsAggregator:
+    """Incrementally aggregate values into hourly and nightly buckets.
+
+    Only the open buckets are kept in memory. A bucket is returned as complete
+    once the first value after its period arrives.
+    """
+
+    __slots__ = (
+        "_time_zone", "_night_start_hour", "_night_end_hour", "_hourly", "_nightly"
+    )
+
+    def __init__(
+        self,
+        time_zone: tzinfo,
+        night_start_hour: int = NIGHT_START_HOUR,
+        night_end_hour: int = NIGHT_END_HOUR,
+    ) -> None:
+        """Initialize the aggregator."""
+        self._time_zone = time_zone
+        self._night_start_hour = night_start_hour
+        self._night_end_hour = night_end_hour
+        self._hourly = None
+        self._nightly = None
+
+    def add(
+        self, timestamp: float, value: float
+    ) -> list[tuple[str, StatisticsBucket]]:
+        """Add a value and return the (period, bucket) pairs it completes."""
+        completed = []
+        hour_start = timestamp - timestamp % 3600
+        if self._hourly is not None and self._hourly.start != hour_start:
+            completed.append((STATISTICS_HOURLY, self._hourly))
+            self._hourly = None
+        if self._hourly is None:
+            self._hourly = StatisticsBucket(hour_start)
+        self._hourly.add(value)
+
+        local = datetime.fromtimestamp(timestamp, self._time_zone)
+        if self._night_start_hour <= local.hour < self._night_end_hour:
+            night_start = local.replace(
+                hour=self._night_start_hour, minute=0, second=0, microsecond=0
+            ).timestamp()
+            # The recorder only accepts statistics starting on a whole hour.
+            night_start -= night_start % 3600
+            if self._nightly is not None and self._nightly.start != night_start:
+                completed.append((STATISTICS_NIGHTLY, self._nightly))
+                self._nightly = None
+            if self._nightly is None:
+                self._nightly = StatisticsBucket(night_start)
+            self._nightly.add(value)
+        elif self._nightly is not None:
+            completed.append((STATISTICS_NIGHTLY, self._nightly))
+            self._nightly = None
+        return completed
+
+
+class CoefficientRanking:
+    """Devices ranked by coefficient, highest first, in an indexed binary heap.
+
+    Positions of every key are kept alongside the heap, so changing or removing
+    one key's value sifts it in place in O(log n). The top n are read without
+    sorting everything by expanding a frontier of heap positions from the root:
+    O(n log n), however many keys are ranked.
+    """
+
+    __slots__ = ("_heap", "_positions")
+
+    def __init__(self) -> None:
+        """Initialize the ranking."""
+        self._heap: list[tuple[float, str]] = []
+        self._positions: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Return the number of ranked keys."""
+        return len(self._heap)
+
+    def update(self, key: str, value: float | None) -> None:
+        """Set the value of a key, removing the key if value is None."""
+        if value is None:
+            self.remove(key)
+            return
+        if (index := self._positions.get(key)) is None:
+            index = len(self._heap)
+            self._heap.append((value, key))
+            self._positions[key] = index
+            self._sift_up(index)
+            return
+        old_value = self._heap[index][0]
+        self._heap[index] = (value, key)
+        if value > old_value:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def remove(self, key: str) -> None:
+        """Remove a key if it is ranked."""
+        if (index := self._positions.pop(key, None)) is None:
+            return
+        last = self._heap.pop()
+        if index == len(self._heap):
+            return
+        self._heap[index] = last
+        self._positions[last[1]] = index
+        self._sift_up(index)
+        self._sift_down(self._positions[last[1]])
+
+    def top(self, count: int) -> list[tuple[str, float]]:
+        """Return the count highest (key, value) pairs, highest first."""
+        heap = self._heap
+        result = []
+        frontier = [(-heap[0][0], 0)] if heap else []
+        while frontier and len(result) < count:
+            negative_value, index = heapq.heappop(frontier)
+            result.append((heap[index][1], -negative_value))
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (-heap[child][0], child))
+        return result
+
+    def _sift_up(self, index: int) -> None:
+        heap = self._heap
+        item = heap[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if heap[parent][0] >= item[0]:
+                break
+            heap[index] = heap[parent]
+            self._positions[heap[index][1]] = index
+            index = parent
+        heap[index] = item
+        self._positions[item[1]] = index
+
+    def _sift_down(self, index: int) -> None:
+        heap = self._heap
+        size = len(heap)
+        item = heap[index]
+        while (child := 2 * index + 1) < size:
+            if child + 1 < size and heap[child + 1][0] > heap[child][0]:
+                child += 1
+            if heap[child][0] <= item[0]:
+                break
+            heap[index] = heap[child]
+            self._positions[heap[index][1]] = index
+            index = child
+        heap[index] = item
+        self._positions[item[1]] = index
+
+
+def predict_indoor_temperature(
+    coefficient: float,
+    in_temp: float,
+    outdoor: Sequence[tuple[float, float]],
+) -> list[tuple[float, float]]:
+    """Integrate dT_in/dt = k (T_out - T_in) through an outdoor forecast.
+
+    The outdoor temperature is linear between the (timestamp, temperature)
+    points of outdoor, the first of which is the time in_temp was read. On
+    each piece T_out = a + b u, where u is the time into the piece, the ODE
+    has the closed form solution
+    T_in(u) = a + b u - b / k + (T_in(0) - a + b / k) exp(-k u),
+    so the forecast costs one exponential per forecast point.
+
+    :returns: (timestamp, indoor temperature) at every point of outdoor
+    """
+    start, out_start = outdoor[0]
+    trajectory = [(start, in_temp)]
+    for end, out_end in outdoor[1:]:
+        duration = end - start
+        if duration <= 0:
+            continue
+        slope = (out_end - out_start) / duration
+        lag = slope / coefficient
+        in_temp = out_end - lag + (in_temp - out_start + lag) * math.exp(
+            -coefficient * duration
+        )
+        trajectory.append((end, in_temp))
+        start, out_start = end, out_end
+    return trajectory
+
+
+def interpolate(
+    points: Sequence[tuple[float, float]], timestamp: float
+) -> float | None:
+    """Return the linear interpolation of sorted (timestamp, value) points.
+
+    None is returned outside the points.
+    """
+    index = bisect.bisect_left(points, (timestamp,))
+    if index == len(points):
+        return None
+    after_time, after = points[index]
+    if after_time == timestamp:
+        return after
+    if index == 0:
+        return None
+    before_time, before = points[index - 1]
+    return before + (after - before) * (timestamp - before_time) / (
+        after_time - before_time
+    )
+
+
+class HeatLossIntegrator:
+    """Running totals of heating degree days and of the heat lost, in kWh.
+
+    Both are integrated with the trapezoid rule between consecutive aligned
+    samples and never decrease. Degree days accumulate while the outdoor
+    temperature is below base_temperature. The heat flow out of the room is
+    thermal_mass k (T_in - T_out), with the thermal mass in kJ/K, so there is
+    no energy total without a thermal mass or a coefficient.
+    """
+
+    __slots__ = (
+        "_base_temperature", "_thermal_mass", "_previous", "degree_days", "energy"
+    )
+
+    def __init__(
+        self,
+        base_temperature: float = BASE_TEMPERATURE_DEFAULT,
+        thermal_mass: float = 0.0,
+    ) -> None:
+        """Initialize the integrator."""
+        self._base_temperature = base_temperature
+        self._thermal_mass = thermal_mass
+        self._previous = None
+        self.degree_days = 0.0
+        self.energy = 0.0 if thermal_mass > 0 else None
+
+    def update(
+        self,
+        timestamp: float,
+        in_temp: float,
+        out_temp: float,
+        coefficient: float | None,
+    ) -> None:
+        """Add an aligned sample and the coefficient estimated at it."""
+        deficit = max(self._base_temperature - out_temp, 0.0)
+        # Heat gained when it is warmer outside isn't counted against losses.
+        power = (
+            None
+            if self.energy is None or coefficient is None
+            else max(self._thermal_mass * coefficient * (in_temp - out_temp), 0.0)
+        )
+        previous = self._previous
+        self._previous = (timestamp, deficit, power)
+        if previous is None or timestamp <= previous[0]:
+            return
+        duration = timestamp - previous[0]
+        self.degree_days += (previous[1] + deficit) / 2 * duration / 86400
+        if power is not None and previous[2] is not None:
+            # kJ/K times 1/s times K is kW.
+            self.energy += (previous[2] + power) / 2 * duration / 3600
+
+    def restore(self, degree_days: float = 0.0, energy: float = 0.0) -> None:
+        """Add totals carried over from before a restart."""
+        self.degree_days += degree_days
+        if self.energy is not None:
+            self.energy += energy
+
+
+class AdaptiveScanInterval:
+    """Refresh period that backs off exponentially while values are stable.
+
+    The period doubles at every refresh, up to maximum, as long as neither the
+    coefficient nor the temperature difference is changing faster than
+    ADAPTIVE_COEFFICIENT_RATE and ADAPTIVE_DELTA_T_RATE, and drops straight back
+    to minimum as soon as one of them is.
+    """
+
+    __slots__ = ("_minimum", "_maximum", "interval", "_last")
+
+    def __init__(self, minimum: float, maximum: float) -> None:
+        """Initialize the interval in seconds."""
+        self._minimum = minimum
+        self._maximum = max(minimum, maximum)
+        self.interval = minimum
+        self._last = None
+
+    def update(
+        self, timestamp: float, coefficient: float | None, delta_t: float | None
+    ) -> float:
+        """Return the seconds until the next refresh given the current values."""
+        last = self._last
+        self._last = (timestamp, coefficient, delta_t)
+        if last is None or coefficient is None or delta_t is None:
+            self.interval = self._minimum
+        elif self._is_changing(last, timestamp, coefficient, delta_t):
+            self.interval = self._minimum
+        else:
+            self.interval = min(self.interval * 2, self._maximum)
+        return self.interval
+
+    @staticmethod
+    def _is_changing(
+        last: tuple, timestamp: float, coefficient: float, delta_t: float
+    ) -> bool:
+        last_timestamp, last_coefficient, last_delta_t = last
+        if last_coefficient is None or last_delta_t is None:
+            return True
+        minutes = (timestamp - last_timestamp) / 60
+        if minutes <= 0:
+            return False
+        if abs(delta_t - last_delta_t) > ADAPTIVE_DELTA_T_RATE * minutes:
+            return True
+        return abs(coefficient - last_coefficient) > (
+            ADAPTIVE_COEFFICIENT_RATE * minutes * abs(last_coefficient)
+        )
+
+
+class ChangePointDetector:
+    """Two-sided CUSUM on the z-scores of a stream.
+
+    The mean and variance are exponentially weighted over span samples, so the
+    detector adapts to slow drift and holds O(1) state. Each z-score less the
+    drift is accumulated upwards and downwards, and a change is reported once
+    either sum passes threshold. The scale is floored at a fraction of the mean
+    so a smooth stream, like a recursive estimate, doesn't alarm on noise-free
+    drift. z-scores are clipped to clip, so a lone outlier, as a coefficient
+    observed over a short span of rounded readings often is, can't pass
+    threshold by itself; a lasting change still does within a few values.
+    """
+
+    __slots__ = (
+        "_alpha",
+        "_clip",
+        "_drift",
+        "_threshold",
+        "_warmup",
+        "_count",
+        "_mean",
+        "_variance",
+        "_upper",
+        "_lower",
+    )
+
+    _RELATIVE_SCALE_FLOOR = 0.05
+
+    def __init__(
+        self,
+        span: int = CHANGE_POINT_SPAN,
+        drift: float = CHANGE_POINT_DRIFT,
+        threshold: float = CHANGE_POINT_THRESHOLD,
+        warmup: int = CHANGE_POINT_WARMUP,
+        clip: float = CHANGE_POINT_CLIP,
+    ) -> None:
+        """Initialize the detector."""
+        self._alpha = 2 / (span + 1)
+        self._clip = clip
+        self._drift = drift
+        self._threshold = threshold
+        self._warmup = warmup
+        self.reset()
+
+    def update(self, value: float) -> int:
+        """Add a value and return 1 or -1 on an upward or downward change, else 0."""
+        self._count += 1
+        deviation = value - self._mean
+        if self._count > self._warmup:
+            scale = max(
+                math.sqrt(self._variance), self._RELATIVE_SCALE_FLOOR * abs(self._mean)
+            )
+            if scale > 0:
+                z_score = max(-self._clip, min(self._clip, deviation / scale))
+                self._upper = max(0.0, self._upper + z_score - self._drift)
+                self._lower = max(0.0, self._lower - z_score - self._drift)
+                if self._upper > self._threshold or self._lower > self._threshold:
+                    direction = 1 if self._upper > self._threshold else -1
+                    self.reset()
+                    return direction
+        # Plain running mean and variance until span samples have been seen.
+        alpha = max(self._alpha, 1 / self._count)
+        increment = alpha * deviation
+        self._mean += increment
+        self._variance = (1 - alpha) * (self._variance + deviation * increment)
+        return 0
+
+    def reset(self) -> None:
+        """Forget all values."""
+        self._count = 0
+        self._mean = 0.0
+        self._variance = 0.0
+        self._upper = 0.0
+        self._lower = 0.0
+
+
+class CoolingSegmenter:
+    """Split aligned samples into cooling segments between heating periods.
+
+    A segment opens settle seconds after heating stops and closes when heating
+    resumes, or once it holds max_samples. Samples outside a segment, or while
+    the heating state is still unknown, are dropped straight away.
+    """
+
+    __slots__ = ("_settle", "_max_samples", "_heating", "_opens_at", "_segment")
+
+    def __init__(
+        self,
+        settle: float = SEGMENT_SETTLE,
+        max_samples: int = SEGMENT_MAX_SAMPLES,
+    ) -> None:
+        """Initialize the segmenter."""
+        self._settle = settle
+        self._max_samples = max_samples
+        self._heating = None
+        self._opens_at = None
+        self._segment = []
+
+    def set_heating(
+        self, timestamp: float, heating: bool | None
+    ) -> list[tuple[float, float, float]] | None:
+        """Update the heating state and return the segment it closes, if any."""
+        if heating == self._heating:
+            return None
+        self._heating = heating
+        if heating is False:
+            self._opens_at = timestamp + self._settle
+            return None
+        return self._close()
+
+    def add(
+        self, sample: tuple[float, float, float]
+    ) -> list[tuple[float, float, float]] | None:
+        """Add an aligned sample and return the segment it completes, if any."""
+        if self._heating is not False or sample[0] < self._opens_at:
+            return None
+        self._segment.append(sample)
+        if len(self._segment) >= self._max_samples:
+            return self._close()
+        return None
+
+    def _close(self) -> list[tuple[float, float, float]] | None:
+        segment = self._segment
+        self._segment = []
+        return segment or None
+
+
+class SampleArchive:
+    """Append-only file of fixed width (timestamp, indoor, outdoor) records.
+
+    Samples are buffered in memory and written in batches. Reads map the file
+    into memory and binary search it by timestamp, which is far cheaper than
+    paging through recorder rows. Once the file would grow past max_bytes it is
+    rotated to a single ".1" file. write and the read methods do blocking I/O
+    and must run in an executor.
+    """
+
+    __slots__ = ("path", "_max_bytes", "_batch_size", "_buffer", "_write_lock")
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = ARCHIVE_MAX_BYTES,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+    ) -> None:
+        """Initialize the archive. Nothing is touched on disk until written."""
+        self.path = path
+        self._max_bytes = max_bytes
+        self._batch_size = batch_size
+        self._buffer = bytearray()
+        self._write_lock = threading.Lock()
+
+    def append(self, sample: tuple[float, ...]) -> bool:
+        """Buffer a sample and return whether a batch is ready to be written.
+
+        Only the timestamp and temperatures are archived.
+        """
+        self._buffer += ARCHIVE_RECORD.pack(sample[0], sample[1], sample[2])
+        return len(self._buffer) >= self._batch_size * ARCHIVE_RECORD.size
+
+    def buffered(self) -> list[tuple[float, float, float]]:
+        """Return the samples not written to the file yet."""
+        return list(ARCHIVE_RECORD.iter_unpack(self._buffer))
+
+    def take_batch(self) -> bytes:
+        """Return the buffered records and clear the buffer."""
+        batch = bytes(self._buffer)
+        self._buffer.clear()
+        return batch
+
+    def write(self, batch: bytes) -> None:
+        """Append records to the file, rotating it first if it is full."""
+        if not batch:
+            return
+        with self._write_lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                size = 0
+            if size and size + len(batch) > self._max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+                size = 0
+            with open(self.path, "ab") as file:
+                if partial := size % ARCHIVE_RECORD.size:
+                    # Drop a record left incomplete by an interrupted write.
+                    file.truncate(size - partial)
+                file.write(batch)
+
+    def read(
+        self, start: float | None = None, end: float | None = None
+    ) -> list[tuple[float, float, float]]:
+        """Return the written samples with start <= timestamp < end."""
+        samples = []
+        for path in (f"{self.path}.1", self.path):
+            samples += _read_archive_file(path, start, end)
+        return samples
+
+    def tail(self, count: int) -> list[tuple[float, float, float]]:
+        """Return the last count written samples."""
+        samples = _read_archive_file(self.path, last=count)
+        if len(samples) < count:
+            samples = (
+                _read_archive_file(f"{self.path}.1", last=count - len(samples))
+                + samples
+            )
+        return samples
+
+
+def _read_archive_file(
+    path: str,
+    start: float | None = None,
+    end: float | None = None,
+    last: int | None = None,
+) -> list[tuple[float, float, float]]:
+    """Read records from one archive file through a memory map."""
+    record_size = ARCHIVE_RECORD.size
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return []
+    with file:
+        # A trailing partial record is left by an interrupted write.
+        count = os.fstat(file.fileno()).st_size // record_size
+        if count == 0:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+
+            def bisect(timestamp: float) -> int:
+                low, high = 0, count
+                while low < high:
+                    middle = (low + high) // 2
+                    record = ARCHIVE_RECORD.unpack_from(mapped, middle * record_size)
+                    if record[0] < timestamp:
+                        low = middle + 1
+                    else:
+                        high = middle
+                return low
+
+            first = 0 if start is None else bisect(start)
+            stop = count if end is None else bisect(end)
+            if last is not None:
+                first = max(first, stop - last)
+            return list(
+                ARCHIVE_RECORD.iter_unpack(
+                    mapped[first * record_size:stop * record_size]
+                )
+            )
+
+
+class HeatTransferEngine:
+    """Ingest, alignment, estimation and aggregation for one room.
+
+    Readings are aligned onto the sample grid and every aligned sample is fed
+    to the estimator, directly or, when segmented, a cooling segment at a time
+    between the heating periods reported by set_heating. Readings of several
+    indoor sensors are fused with fuse before they are added.
+
+    Heating degree days and the heat lost are integrated over every sample,
+    in or out of a cooling segment.
+
+    on_sample is called with every aligned sample once it has been consumed,
+    on_change_point with the stream, direction (1 or -1) and sample of every
+    change point, and on_statistics with every completed statistics bucket.
+    """
+
+    __slots__ = (
+        "_aligner",
+        "_fusion",
+        "_estimator",
+        "_segmenter",
+        "_change_points",
+        "_indoor",
+        "_indoor_changes",
+        "_window",
+        "_statistics",
+        "_totals",
+        "sample",
+        "on_sample",
+        "on_change_point",
+        "on_statistics",
+    )
+
+    def __init__(
+        self,
+        sample_period: float = SAMPLE_PERIOD_DEFAULT,
+        resample_method: str = RESAMPLE_METHOD_DEFAULT,
+        estimator: str = ESTIMATOR_DEFAULT,
+        estimator_window: int = ESTIMATOR_WINDOW_DEFAULT,
+        forgetting_factor: float = FORGETTING_FACTOR_DEFAULT,
+        wind_speed: bool = False,
+        irradiance: bool = False,
+        fused: bool = False,
+        segmented: bool = False,
+        change_detection: bool = False,
+        statistics: bool = False,
+        time_zone: tzinfo = timezone.utc,
+        base_temperature: float = BASE_TEMPERATURE_DEFAULT,
+        thermal_mass: float = 0.0,
+        on_sample: Callable[[tuple[float, ...]], None] | None = None,
+        on_change_point: Callable[[str, int, tuple[float, ...]], None] | None = None,
+        on_statistics: Callable[[str, StatisticsBucket], None] | None = None,
+    ) -> None:
+        """Initialize the engine.
+
+        Wind speed and irradiance are extra aligner channels, in that order
+        after the outdoor one, and only used by the multivariate estimator.
+        They never hold back samples and read as 0, calm and dark, until
+        first reported.
+        The thermal mass, in kJ/K, is ignored by estimators not fitting k.
+        """
+        if EstimatorType(estimator) is not EstimatorType.MULTIVARIATE_RLS:
+            wind_speed = irradiance = False
+        self._aligner = StreamAligner(
+            optional=wind_speed + irradiance,
+            period=sample_period,
+            method=ResampleMethod(resample_method),
+        )
+        self._fusion = TemperatureFusion() if fused else None
+        self._estimator = create_estimator(
+            estimator,
+            estimator_window,
+            forgetting_factor,
+            wind_speed=wind_speed,
+            irradiance=irradiance,
+        )
+        self._segmenter = CoolingSegmenter() if segmented else None
+        # Detectors on the coefficient and on each sample's own coefficient.
+        # A temperature difference estimate drifts all night, so isn't checked.
+        self._change_points = (
+            (ChangePointDetector(), ChangePointDetector())
+            if change_detection and isinstance(self._estimator, NewtonEstimator)
+            else None
+        )
+        # Latest indoor reading, timestamps of the indoor readings that changed
+        # it and the grid hasn't passed yet, and the (sum of sample
+        # coefficients weighted by dT, sum of weights) since the grid passed
+        # the last one, see _detect_change_point.
+        self._indoor = None
+        self._indoor_changes = []
+        self._window = None
+        self._statistics = StatisticsAggregator(time_zone) if statistics else None
+        self._totals = HeatLossIntegrator(
+            base_temperature,
+            thermal_mass if isinstance(self._estimator, NewtonEstimator) else 0.0,
+        )
+        # Latest aligned (timestamp, indoor, outdoor, *regressors) sample.
+        self.sample = None
+        self.on_sample = on_sample
+        self.on_change_point = on_change_point
+        self.on_statistics = on_statistics
+
+    @property
+    def estimator(self):
+        """Return the estimator."""
+        return self._estimator
+
+    @property
+    def coefficient(self) -> float | None:
+        """Return the current estimate of the coefficient."""
+        return self._estimator.value
+
+    @property
+    def degree_days(self) -> float:
+        """Return the heating degree days accumulated so far."""
+        return self._totals.degree_days
+
+    @property
+    def energy(self) -> float | None:
+        """Return the heat lost so far in kWh, None without a thermal mass."""
+        return self._totals.energy
+
+    @property
+    def bootstrap_size(self) -> int:
+        """Return how many of the latest samples rebuild the estimate.
+
+        Zero when segmented: the archive holds no heating state, so heated
+        samples can't be told apart from cooling ones.
+        """
+        if self._segmenter is not None:
+            return 0
+        return self._estimator.bootstrap_size
+
+    def fuse(self, member: str, timestamp: float, value: float) -> float:
+        """Return the fused indoor temperature after a reading of member.
+
+        Without fusion the reading is returned as is.
+        """
+        if self._fusion is None:
+            return value
+        return self._fusion.add(member, timestamp, value)
+
+    def unfuse(self, member: str) -> None:
+        """Leave an unavailable member out of the fused indoor temperature."""
+        if self._fusion is not None:
+            self._fusion.discard(member)
+
+    def add_reading(self, channel: int, timestamp: float, value: float) -> bool:
+        """Add a reading of a channel at a POSIX timestamp.
+
+        :returns: whether the estimate was updated
+        """
+        if (
+            channel == IN_CHANNEL
+            and self._change_points is not None
+            and value != self._indoor
+        ):
+            self._indoor = value
+            changes = self._indoor_changes
+            if not changes or timestamp > changes[-1]:
+                if len(changes) >= SEGMENT_MAX_SAMPLES:
+                    # Heated for long; the oldest are before any segment.
+                    del changes[0]
+                changes.append(timestamp)
+        changed = False
+        for sample in self._aligner.add(channel, timestamp, value):
+            changed |= self._add_sample(sample)
+        return changed
+
+    def set_heating(self, timestamp: float, heating: bool | None) -> bool:
+        """Report whether the room is heated from timestamp, None if unknown.
+
+        :returns: whether a cooling segment was closed and fed to the estimator
+        """
+        if self._segmenter is None:
+            return False
+        segment = self._segmenter.set_heating(timestamp, heating)
+        return segment is not None and self._finalize_segment(segment)
+
+    def bootstrap(self, estimator) -> None:
+        """Take over an estimator rebuilt from historical aligned samples.
+
+        The estimator is this engine's one, or a copy of it, after
+        replay_estimator. The first live sample starts a new segment rather
+        than being differenced against the last archived one across the
+        downtime.
+        """
+        estimator.start_segment()
+        self._estimator = estimator
+
+    def restore_totals(self, degree_days: float = 0.0, energy: float = 0.0) -> None:
+        """Add degree days and energy carried over from before a restart."""
+        self._totals.restore(degree_days, energy)
+
+    def reset(self) -> None:
+        """Forget the estimate and the change point history."""
+        self._estimator.reset()
+        self._window = None
+        if self._change_points is not None:
+            for change_point in self._change_points:
+                change_point.reset()
+
+    def _add_sample(self, sample: tuple[float, ...]) -> bool:
+        self.sample = sample
+        if self._segmenter is None:
+            observed = self._estimator.update(*sample)
+            self._detect_change_point(sample, observed)
+            self._update_statistics(sample[0])
+            changed = True
+        elif (segment := self._segmenter.add(sample)) is not None:
+            changed = self._finalize_segment(segment)
+        else:
+            changed = False
+        self._totals.update(sample[0], sample[1], sample[2], self._estimator.value)
+        if self.on_sample is not None:
+            self.on_sample(sample)
+        return changed
+
+    def _finalize_segment(self, segment: list[tuple[float, ...]]) -> bool:
+        """Feed a complete cooling segment to the estimator.
+
+        :returns: whether the segment was long enough to be used
+        """
+        if len(segment) < SEGMENT_MIN_SAMPLES:
+            LOGGER.debug("Discarding cooling segment of %d samples", len(segment))
+            return False
+        self._estimator.start_segment()
+        self._window = None
+        for sample in segment:
+            observed = self._estimator.update(*sample)
+            self._detect_change_point(sample, observed)
+        self._update_statistics(segment[-1][0])
+        return True
+
+    def _detect_change_point(
+        self, sample: tuple[float, ...], observed: float | None
+    ) -> None:
+        """Restart the estimator when the coefficient changes abruptly.
+
+        Samples from before an open window or an insulation change would
+        otherwise blend into the estimate for a whole window. The coefficient
+        observed in each sample alone, unlike dT, stays level while k does, and
+        shows a change long before the smoothed estimate does.
+
+        Both are only checked once the grid passes an indoor reading that
+        changed the temperature, the sample coefficient as its mean since the
+        previous one, weighted by dT. Between two readings of a sensor
+        reporting on change the samples lie on one straight line, or on a
+        held value and a step, so their own coefficients are the same or
+        mostly 0 and a CUSUM sums them as if they were independent evidence.
+        A sensor reporting a new value every sample is checked every sample.
+        """
+        if self._change_points is None:
+            return
+        changes = self._indoor_changes
+        passed = 0
+        while passed < len(changes) and changes[passed] <= sample[0]:
+            passed += 1
+        del changes[:passed]
+        delta_t = abs(sample[2] - sample[1])
+        if self._window is None:
+            # The window runs from a change, so the first one opens it.
+            if passed:
+                self._window = (0.0, 0.0)
+            return
+        weighted, weight = self._window
+        if observed is not None and delta_t >= CHANGE_POINT_MIN_DELTA_T:
+            weighted += observed * delta_t
+            weight += delta_t
+        if not passed:
+            self._window = (weighted, weight)
+            return
+        self._window = (0.0, 0.0)
+        for stream, detector, value in (
+            (STREAM_COEFFICIENT, self._change_points[0], self._estimator.value),
+            (
+                STREAM_SAMPLE_COEFFICIENT,
+                self._change_points[1],
+                weighted / weight if weight else None,
+            ),
+        ):
+            if value is None or not (direction := detector.update(value)):
+                continue
+            self.reset()
+            if self.on_change_point is not None:
+                self.on_change_point(stream, direction, sample)
+            return
+
+    def _update_statistics(self, timestamp: float) -> None:
+        if self._statistics is None or self._estimator.value is None:
+            return
+        for period, bucket in self._statistics.add(timestamp, self._estimator.value):
+            if self.on_statistics is not None:
+                self.on_statistics(period, bucket)
@@ -0,0 +1,30 @@
+"""Helpers shared by the config flow and the runtime path of heat_transfer."""
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+
+
+def get_value(config_entry: ConfigEntry | None, param: str, default=None):
+    """Get current value for configuration parameter.
+
+    :param config_entry: config_entries|None: config entry from Flow
+    :param param: str: parameter name for getting value
+    :param default: default value for parameter, defaults to None
+    :returns: parameter value, or default value or None
+    """
+    if config_entry is not None:
+        return config_entry.options.get(param, config_entry.data.get(param, default))
+    return default
+
+
+def as_entity_list(value: str | list[str] | None) -> list[str]:
+    """Return a configured entity_id or list of entity_ids as a list.
+
+    :param value: entity_id, list of entity_ids or None
+    :returns: list of entity_ids
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
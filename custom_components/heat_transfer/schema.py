@@ -0,0 +1,77 @@
+"""YAML configuration schemas for heat_transfer.
+
+Only needed when the integration is configured from YAML, so kept out of the
+modules imported on every startup.
+"""
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+
+from .const import (
+    CONF_ADAPTIVE_SCAN_INTERVAL,
+    CONF_ARCHIVE,
+    CONF_BASE_TEMPERATURE,
+    CONF_CHANGE_DETECTION,
+    CONF_CLIMATE_ENTITY,
+    CONF_ESTIMATOR,
+    CONF_ESTIMATOR_WINDOW,
+    CONF_FORECAST_TIME,
+    CONF_FORGETTING_FACTOR,
+    CONF_HEATER_ENTITY,
+    CONF_IRRADIANCE_ENTITY,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_POLL,
+    CONF_RESAMPLE_METHOD,
+    CONF_SAMPLE_PERIOD,
+    CONF_SCAN_INTERVAL,
+    CONF_SENSOR_TYPES,
+    CONF_SIGNIFICANT_CHANGE,
+    CONF_STATISTICS,
+    CONF_THERMAL_MASS,
+    CONF_WEATHER_ENTITY,
+    CONF_WIND_SPEED_ENTITY,
+    EstimatorType,
+    ResampleMethod,
+)
+
+SENSOR_OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_ADAPTIVE_SCAN_INTERVAL): cv.boolean,
+        vol.Optional(CONF_ARCHIVE): cv.boolean,
+        vol.Optional(CONF_BASE_TEMPERATURE): vol.Coerce(float),
+        vol.Optional(CONF_CHANGE_DETECTION): cv.boolean,
+        vol.Optional(CONF_CLIMATE_ENTITY): cv.entity_id,
+        vol.Optional(CONF_ESTIMATOR): vol.In(
+            [estimator.value for estimator in EstimatorType]
+        ),
+        vol.Optional(CONF_ESTIMATOR_WINDOW): cv.positive_int,
+        vol.Optional(CONF_FORECAST_TIME): cv.time,
+        vol.Optional(CONF_FORGETTING_FACTOR): vol.All(
+            vol.Coerce(float), vol.Range(min=0.9, max=1)
+        ),
+        vol.Optional(CONF_HEATER_ENTITY): cv.entity_id,
+        vol.Optional(CONF_IRRADIANCE_ENTITY): cv.entity_id,
+        vol.Optional(CONF_MAX_SCAN_INTERVAL): cv.time_period,
+        vol.Optional(CONF_POLL): cv.boolean,
+        vol.Optional(CONF_RESAMPLE_METHOD): vol.In(
+            [method.value for method in ResampleMethod]
+        ),
+        vol.Optional(CONF_SAMPLE_PERIOD): cv.time_period,
+        vol.Optional(CONF_SCAN_INTERVAL): cv.time_period,
+        vol.Optional(CONF_SENSOR_TYPES): cv.ensure_list,
+        vol.Optional(CONF_SIGNIFICANT_CHANGE): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=100)
+        ),
+        vol.Optional(CONF_STATISTICS): cv.boolean,
+        vol.Optional(CONF_THERMAL_MASS): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(CONF_WEATHER_ENTITY): cv.entity_id,
+        vol.Optional(CONF_WIND_SPEED_ENTITY): cv.entity_id,
+    },
+    extra=vol.REMOVE_EXTRA,
+)
+
+OPTIONS_SCHEMA = vol.Schema({}).extend(
+    SENSOR_OPTIONS_SCHEMA.schema,
+    extra=vol.REMOVE_EXTRA,
+)
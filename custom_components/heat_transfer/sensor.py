@@ -1,16 +1,21 @@
 """Sensor platform for heat_transfer."""
 from __future__ import annotations
+import asyncio
+import bisect
+import copy
 from asyncio import Lock
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
-from datetime import timedelta
-from functools import wraps
+from datetime import datetime, time, timedelta
+from functools import partial, wraps
 import math
 from typing import Any
 
 from homeassistant import util
-from homeassistant.backports.enum import StrEnum
 from homeassistant.components.sensor import (
     DOMAIN as SENSOR_DOMAIN,
+    RestoreSensor,
+    SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
@@ -23,56 +28,112 @@ from homeassistant.const import (
     CONF_NAME,
     CONF_SENSORS,
     CONF_UNIQUE_ID,
+    EVENT_HOMEASSISTANT_STOP,
+    STATE_ON,
     STATE_UNAVAILABLE,
     STATE_UNKNOWN,
+    UnitOfEnergy,
+    UnitOfSpeed,
     UnitOfTemperature,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers import entity_registry
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.event import (
+    async_call_later,
     async_track_state_change_event,
     async_track_time_interval,
 )
 from homeassistant.helpers.template import Template
 from homeassistant.loader import async_get_custom_components
-from homeassistant.util.unit_conversion import TemperatureConverter
+from homeassistant.util import dt as dt_util, slugify
+from homeassistant.util.unit_conversion import SpeedConverter, TemperatureConverter
 
 from .const import (
+    ARCHIVE_DEFAULT,
+    CHANGE_DETECTION_DEFAULT,
+    ADAPTIVE_SCAN_INTERVAL_DEFAULT,
     ATTR_COEFFICIENT,
+    BASE_TEMPERATURE_DEFAULT,
+    CONF_ADAPTIVE_SCAN_INTERVAL,
+    CONF_ARCHIVE,
+    CONF_BASE_TEMPERATURE,
+    CONF_CHANGE_DETECTION,
+    CONF_CLIMATE_ENTITY,
     CONF_ENABLED_SENSORS,
+    CONF_ESTIMATOR,
+    CONF_ESTIMATOR_WINDOW,
+    CONF_FORECAST_TIME,
+    CONF_FORGETTING_FACTOR,
+    CONF_HEATER_ENTITY,
     CONF_IN_T_SENSOR,
+    CONF_IRRADIANCE_ENTITY,
+    CONF_MAX_SCAN_INTERVAL,
     CONF_OUT_T_SENSOR,
     CONF_POLL,
+    CONF_RESAMPLE_METHOD,
+    CONF_ROOM_SENSORS,
+    CONF_SAMPLE_PERIOD,
     CONF_SCAN_INTERVAL,
     CONF_SENSOR_TYPES,
+    CONF_SIGNIFICANT_CHANGE,
+    CONF_STATISTICS,
+    CONF_THERMAL_MASS,
+    CONF_WEATHER_ENTITY,
+    CONF_WIND_SPEED_ENTITY,
+    DATA_DEVICES,
+    DATA_YAML_UNSUBSCRIBES,
     DEFAULT_NAME,
     DISPLAY_PRECISION,
+    EVENT_CHANGE_POINT,
     DOMAIN,
+    ESTIMATOR_DEFAULT,
+    ESTIMATOR_WINDOW_DEFAULT,
+    FORECAST_RECOMPUTE_CHANGE,
+    FORECAST_TIME_DEFAULT,
+    FORGETTING_FACTOR_DEFAULT,
     LOGGER,
+    MAX_SCAN_INTERVAL_DEFAULT,
     POLL_DEFAULT,
+    RANKING_SIZE,
+    RESAMPLE_METHOD_DEFAULT,
+    SAMPLE_PERIOD_DEFAULT,
     SCAN_INTERVAL_DEFAULT,
+    SIGNIFICANT_CHANGE_DEFAULT,
+    STATISTICS_DEFAULT,
+    THERMAL_MASS_DEFAULT,
+    TOTAL_PRECISION,
+    EstimatorType,
+    SensorType,
 )
+from .engine import (
+    IN_CHANNEL,
+    OUT_CHANNEL,
+    AdaptiveScanInterval,
+    CoefficientRanking,
+    HeatTransferEngine,
+    NewtonEstimator,
+    SampleArchive,
+    StatisticsBucket,
+    interpolate,
+    predict_indoor_temperature,
+    replay_estimator,
+)
+from .helpers import as_entity_list
 
+ATTR_FORECAST = "forecast"
+ATTR_FORECAST_TIME = "datetime"
+ATTR_FORECAST_TEMPERATURE = "temperature"
+ATTR_TEMPERATURE_UNIT = "temperature_unit"
+ATTR_TRAJECTORY = "trajectory"
+ATTR_RANKING = "ranking"
+RANKING_UNIQUE_ID_SUFFIX = "ranking"
+ATTR_HVAC_ACTION = "hvac_action"
+CLIMATE_DOMAIN = "climate"
+HVAC_ACTION_HEATING = "heating"
+HVAC_MODE_HEAT = "heat"
 
-class SensorType(StrEnum):
-    """Sensor type enum."""
-
-    HEAT_TRANSFER_COEFFICIENT = "heat_transfer_coefficient"
-
-    def to_name(self) -> str:
-        """Return the title of the sensor type."""
-        return self.value.replace("_", " ").capitalize()
-
-    @classmethod
-    def from_string(cls, string: str) -> "SensorType":
-        """Return the sensor type from string."""
-        if string in list(cls):
-            return cls(string)
-        raise ValueError(
-            f"Unknown sensor type: {string}. Please check https://github.com/CJDumbleton/heat_transfer for valid options."
-            )
 
 SENSOR_TYPES = {
     SensorType.HEAT_TRANSFER_COEFFICIENT: {
@@ -82,9 +143,35 @@ SENSOR_TYPES = {
         "native_unit_of_measurement": "1/s",
         "state_class": SensorStateClass.MEASUREMENT,
         #"suggested_display_precision": DISPLAY_PRECISION,
-    }
+    },
+    SensorType.INDOOR_TEMPERATURE_FORECAST: {
+        "device_class": SensorDeviceClass.TEMPERATURE,
+        "icon": "mdi:home-thermometer-outline",
+        "key": SensorType.INDOOR_TEMPERATURE_FORECAST,
+        "name": SensorType.INDOOR_TEMPERATURE_FORECAST.to_name(),
+        "native_unit_of_measurement": UnitOfTemperature.CELSIUS,
+        "state_class": SensorStateClass.MEASUREMENT,
+    },
+    SensorType.HEATING_DEGREE_DAYS: {
+        "icon": "mdi:snowflake-thermometer",
+        "key": SensorType.HEATING_DEGREE_DAYS,
+        "name": SensorType.HEATING_DEGREE_DAYS.to_name(),
+        "native_unit_of_measurement": f"{UnitOfTemperature.CELSIUS}·d",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+    },
+    SensorType.HEAT_LOSS_ENERGY: {
+        "device_class": SensorDeviceClass.ENERGY,
+        "icon": "mdi:home-export-outline",
+        "key": SensorType.HEAT_LOSS_ENERGY,
+        "name": SensorType.HEAT_LOSS_ENERGY.to_name(),
+        "native_unit_of_measurement": UnitOfEnergy.KILO_WATT_HOUR,
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+    },
 }
 
+# Totals integrated over every sample and restored across restarts.
+TOTAL_SENSOR_TYPES = (SensorType.HEATING_DEGREE_DAYS, SensorType.HEAT_LOSS_ENERGY)
+
 DEFAULT_SENSOR_TYPES = list(SENSOR_TYPES.keys())
 
 def compute_once_lock(sensor_type):
@@ -116,6 +203,10 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
         options = discovery_info["options"]
 
     sensors = []
+    # Stopped by the reload service, as there is no config entry to unload.
+    unsubscribes = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_YAML_UNSUBSCRIBES, []
+    )
 
     for device_config in devices:
         device_config = options | device_config
@@ -129,10 +220,49 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
             scan_interval=device_config.get(
                 CONF_SCAN_INTERVAL, timedelta(seconds=SCAN_INTERVAL_DEFAULT)
             ),
+            adaptive_scan_interval=device_config.get(
+                CONF_ADAPTIVE_SCAN_INTERVAL, ADAPTIVE_SCAN_INTERVAL_DEFAULT
+            ),
+            max_scan_interval=device_config.get(
+                CONF_MAX_SCAN_INTERVAL, timedelta(seconds=MAX_SCAN_INTERVAL_DEFAULT)
+            ),
+            sample_period=device_config.get(
+                CONF_SAMPLE_PERIOD, timedelta(seconds=SAMPLE_PERIOD_DEFAULT)
+            ),
+            resample_method=device_config.get(
+                CONF_RESAMPLE_METHOD, RESAMPLE_METHOD_DEFAULT
+            ),
+            estimator=device_config.get(CONF_ESTIMATOR, ESTIMATOR_DEFAULT),
+            estimator_window=device_config.get(
+                CONF_ESTIMATOR_WINDOW, ESTIMATOR_WINDOW_DEFAULT
+            ),
+            forgetting_factor=device_config.get(
+                CONF_FORGETTING_FACTOR, FORGETTING_FACTOR_DEFAULT
+            ),
+            statistics=device_config.get(CONF_STATISTICS, STATISTICS_DEFAULT),
+            significant_change=device_config.get(
+                CONF_SIGNIFICANT_CHANGE, SIGNIFICANT_CHANGE_DEFAULT
+            ),
+            archive=device_config.get(CONF_ARCHIVE, ARCHIVE_DEFAULT),
+            change_detection=device_config.get(
+                CONF_CHANGE_DETECTION, CHANGE_DETECTION_DEFAULT
+            ),
+            weather_entity=device_config.get(CONF_WEATHER_ENTITY),
+            forecast_time=device_config.get(CONF_FORECAST_TIME, FORECAST_TIME_DEFAULT),
+            base_temperature=device_config.get(
+                CONF_BASE_TEMPERATURE, BASE_TEMPERATURE_DEFAULT
+            ),
+            thermal_mass=device_config.get(CONF_THERMAL_MASS, THERMAL_MASS_DEFAULT),
+            climate_entity=device_config.get(CONF_CLIMATE_ENTITY),
+            heater_entity=device_config.get(CONF_HEATER_ENTITY),
+            **(regressor_sources := _regressor_sources(hass, device_config)),
         )
+        unsubscribes.append(compute_device.async_start())
+        for source in regressor_sources.values():
+            unsubscribes.append(source.async_start())
 
         sensors += [
-            SensorHeatTransfer(
+            _sensor_class(SensorType.from_string(sensor_type))(
                 device=compute_device,
                 entity_description=SensorEntityDescription(
                     **SENSOR_TYPES[SensorType.from_string(sensor_type)]
@@ -143,7 +273,7 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
                 is_config_entry=False,
             )
             for sensor_type in device_config.get(
-                CONF_SENSOR_TYPES, DEFAULT_SENSOR_TYPES
+                CONF_SENSOR_TYPES, compute_device.sensor_types
             )
         ]
 
@@ -159,34 +289,151 @@ async def async_setup_entry(hass, entry, async_add_entities):
         ] = SCAN_INTERVAL_DEFAULT
         data[CONF_SCAN_INTERVAL] = SCAN_INTERVAL_DEFAULT
     LOGGER.debug("async_setup_entry: %s", data)
-    compute_device = DeviceHeatTransfer(
-        hass=hass,
-        name=data[CONF_NAME],
-        unique_id=f"{entry.unique_id}",
-        in_temp_sensor_entity=data[CONF_IN_T_SENSOR],
-        out_temp_sensor_entity=data[CONF_OUT_T_SENSOR],
-        should_poll=data[CONF_POLL],
-        scan_interval=timedelta(
-            seconds=data.get(CONF_SCAN_INTERVAL, SCAN_INTERVAL_DEFAULT)
-        ),
+    should_poll = data[CONF_POLL]
+    scan_interval = timedelta(
+        seconds=data.get(CONF_SCAN_INTERVAL, SCAN_INTERVAL_DEFAULT)
+    )
+    sample_period = timedelta(
+        seconds=data.get(CONF_SAMPLE_PERIOD) or SAMPLE_PERIOD_DEFAULT
     )
+    resample_method = data.get(CONF_RESAMPLE_METHOD) or RESAMPLE_METHOD_DEFAULT
+    device_options = {
+        "archive": data.get(CONF_ARCHIVE) or ARCHIVE_DEFAULT,
+        "change_detection": data.get(CONF_CHANGE_DETECTION)
+        or CHANGE_DETECTION_DEFAULT,
+        "weather_entity": data.get(CONF_WEATHER_ENTITY),
+        "forecast_time": data.get(CONF_FORECAST_TIME) or FORECAST_TIME_DEFAULT,
+        "base_temperature": BASE_TEMPERATURE_DEFAULT
+        if data.get(CONF_BASE_TEMPERATURE) is None
+        else data[CONF_BASE_TEMPERATURE],
+        "thermal_mass": data.get(CONF_THERMAL_MASS) or THERMAL_MASS_DEFAULT,
+        "adaptive_scan_interval": data.get(CONF_ADAPTIVE_SCAN_INTERVAL)
+        or ADAPTIVE_SCAN_INTERVAL_DEFAULT,
+        "max_scan_interval": timedelta(
+            seconds=data.get(CONF_MAX_SCAN_INTERVAL) or MAX_SCAN_INTERVAL_DEFAULT
+        ),
+        "estimator": data.get(CONF_ESTIMATOR) or ESTIMATOR_DEFAULT,
+        "estimator_window": data.get(CONF_ESTIMATOR_WINDOW)
+        or ESTIMATOR_WINDOW_DEFAULT,
+        "forgetting_factor": data.get(CONF_FORGETTING_FACTOR)
+        or FORGETTING_FACTOR_DEFAULT,
+        "statistics": data.get(CONF_STATISTICS) or STATISTICS_DEFAULT,
+        "significant_change": SIGNIFICANT_CHANGE_DEFAULT
+        if data.get(CONF_SIGNIFICANT_CHANGE) is None
+        else data[CONF_SIGNIFICANT_CHANGE],
+    }
+    # Shared by all rooms of the entry, like the outdoor sensor.
+    regressor_sources = _regressor_sources(hass, data)
+    device_options.update(regressor_sources)
+    if data.get(CONF_ROOM_SENSORS):
+        # One outdoor subscription shared by all rooms of this entry.
+        out_temp_source = SharedTemperatureSource(hass, data[CONF_OUT_T_SENSOR])
+        compute_devices = [
+            DeviceHeatTransfer(
+                hass=hass,
+                name=_entity_name(hass, in_temp_sensor_entity),
+                unique_id=f"{entry.unique_id}-{in_temp_sensor_entity}",
+                in_temp_sensor_entity=in_temp_sensor_entity,
+                out_temp_sensor_entity=data[CONF_OUT_T_SENSOR],
+                should_poll=should_poll,
+                scan_interval=scan_interval,
+                sample_period=sample_period,
+                resample_method=resample_method,
+                **device_options,
+                out_temp_source=out_temp_source,
+                via_device=entry.unique_id,
+            )
+            for in_temp_sensor_entity in data[CONF_ROOM_SENSORS]
+        ]
+    else:
+        out_temp_source = None
+        compute_devices = [
+            DeviceHeatTransfer(
+                hass=hass,
+                name=data[CONF_NAME],
+                unique_id=f"{entry.unique_id}",
+                in_temp_sensor_entity=data[CONF_IN_T_SENSOR],
+                out_temp_sensor_entity=data[CONF_OUT_T_SENSOR],
+                should_poll=should_poll,
+                scan_interval=scan_interval,
+                sample_period=sample_period,
+                resample_method=resample_method,
+                climate_entity=data.get(CONF_CLIMATE_ENTITY),
+                heater_entity=data.get(CONF_HEATER_ENTITY),
+                **device_options,
+            )
+        ]
+    for compute_device in compute_devices:
+        entry.async_on_unload(compute_device.async_start())
+    if out_temp_source is not None:
+        entry.async_on_unload(out_temp_source.async_start())
+    for source in regressor_sources.values():
+        entry.async_on_unload(source.async_start())
     entities: list[SensorHeatTransfer] = [
-        SensorHeatTransfer(
+        _sensor_class(sensor_type)(
             device=compute_device,
             sensor_type=sensor_type,
             entity_description=SensorEntityDescription(**SENSOR_TYPES[sensor_type]),
         )
-        for sensor_type in SensorType
+        for compute_device in compute_devices
+        for sensor_type in compute_device.sensor_types
     ]
     if CONF_ENABLED_SENSORS in data:
         for entity in entities:
             if entity.entity_description.key not in data[CONF_ENABLED_SENSORS]:
                 entity.entity_description.entity_registry_enabled_default = False
 
+    # A temperature difference says nothing about insulation, so rooms are only
+    # ranked by a fitted coefficient. All rooms of an entry share the estimator.
+    if data.get(CONF_ROOM_SENSORS) and compute_devices[0].fits_coefficient:
+        entities.append(
+            SensorHeatTransferRanking(
+                compute_devices,
+                entry.unique_id,
+                significant_change=device_options["significant_change"],
+            )
+        )
+
     if entities:
         async_add_entities(entities)
 
 
+def _regressor_sources(
+    hass: HomeAssistant, config: dict[str, Any]
+) -> dict[str, SharedTemperatureSource]:
+    """Return the wind speed and irradiance sources a configuration asks for.
+
+    They are only used by the multivariate estimator, so none are returned
+    for the others.
+    """
+    if config.get(CONF_ESTIMATOR) != EstimatorType.MULTIVARIATE_RLS:
+        return {}
+    sources = {}
+    if wind_speed_entity := config.get(CONF_WIND_SPEED_ENTITY):
+        sources["wind_speed_source"] = SharedTemperatureSource(
+            hass, wind_speed_entity, _state_to_wind_speed
+        )
+    if irradiance_entity := config.get(CONF_IRRADIANCE_ENTITY):
+        sources["irradiance_source"] = SharedTemperatureSource(
+            hass, irradiance_entity, _state_to_irradiance
+        )
+    return sources
+
+
+def _sensor_class(sensor_type: SensorType) -> type[SensorHeatTransfer]:
+    """Return the entity class of a sensor type."""
+    if sensor_type in TOTAL_SENSOR_TYPES:
+        return SensorHeatTransferTotal
+    return SensorHeatTransfer
+
+
+def _entity_name(hass: HomeAssistant, entity_id: str) -> str:
+    """Return the friendly name of an entity, falling back to its entity_id."""
+    if (state := hass.states.get(entity_id)) is not None:
+        return state.name
+    return entity_id
+
+
 def id_generator(unique_id: str, sensor_type: str) -> str:
     """Generate id based on unique_id and sensor type.
     :param unique_id: str: common part of id for all entities, device unique_id, as a rule
@@ -248,6 +495,15 @@ class SensorHeatTransfer(SensorEntity):
         """Return device information."""
         return self._device.device_info
 
+    @property
+    def sensor_type(self) -> SensorType:
+        """Return the type of the sensor."""
+        return self._sensor_type
+
+    def set_attribute(self, name: str, value: Any) -> None:
+        """Set a state attribute of this sensor alone, written with its state."""
+        self._attr_extra_state_attributes[name] = value
+
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
@@ -274,6 +530,8 @@ class SensorHeatTransfer(SensorEntity):
         if isinstance(value, tuple) and len(value) == 2:
             if self._sensor_type == SensorType.HEAT_TRANSFER_COEFFICIENT:
                 self._attr_extra_state_attributes[ATTR_COEFFICIENT] = value[1]
+            elif self._sensor_type == SensorType.INDOOR_TEMPERATURE_FORECAST:
+                self._attr_extra_state_attributes[ATTR_TRAJECTORY] = value[1]
             self._attr_native_value = value[0]
         else:
             self._attr_native_value = value
@@ -311,7 +569,87 @@ class SensorHeatTransfer(SensorEntity):
                     )
 
 
-@dataclass
+class SensorHeatTransferTotal(SensorHeatTransfer, RestoreSensor):
+    """heat_transfer Sensor accumulating a total carried over restarts."""
+
+    async def async_added_to_hass(self):
+        """Restore the total, then register callbacks."""
+        if (
+            last := await self.async_get_last_sensor_data()
+        ) is not None and last.native_value is not None:
+            self._device.restore_total(self._sensor_type, float(last.native_value))
+        await super().async_added_to_hass()
+
+
+class SensorHeatTransferRanking(SensorEntity):
+    """Rooms of a multi-room entry with the highest coefficients.
+
+    The state is the name of the room losing heat fastest. The ranking is
+    updated from each room's updates rather than by sorting all rooms. It is
+    only written when the order of the top rooms changes or one of their
+    coefficients moves by more than significant_change percent.
+    """
+
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:podium"
+    _attr_name = "Worst insulated rooms"
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        devices: list["DeviceHeatTransfer"],
+        unique_id: str,
+        count: int = RANKING_SIZE,
+        significant_change: float = SIGNIFICANT_CHANGE_DEFAULT,
+    ) -> None:
+        """Initialize the sensor."""
+        self._devices = {device.unique_id: device for device in devices}
+        self._count = count
+        self._significant_change = significant_change / 100
+        self._ranking = CoefficientRanking()
+        self._top = []
+        self._attr_unique_id = f"{unique_id}{RANKING_UNIQUE_ID_SUFFIX}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, unique_id)})
+        self._attr_native_value = None
+        self._attr_extra_state_attributes = {ATTR_RANKING: []}
+
+    async def async_added_to_hass(self) -> None:
+        """Rank the rooms and follow their updates."""
+        for device in self._devices.values():
+            self._ranking.update(device.unique_id, device.coefficient)
+            self.async_on_remove(device.async_subscribe_updates(self._async_rank))
+        self._async_refresh()
+
+    @callback
+    def _async_rank(self, device: "DeviceHeatTransfer") -> None:
+        self._ranking.update(device.unique_id, device.coefficient)
+        if self._async_refresh():
+            self.async_write_ha_state()
+
+    @callback
+    def _async_refresh(self) -> bool:
+        """Recompute the top rooms and return whether they changed."""
+        top = self._ranking.top(self._count)
+        if [unique_id for unique_id, _ in top] == [
+            unique_id for unique_id, _ in self._top
+        ] and all(
+            abs(value - published) <= self._significant_change * abs(published)
+            for (_, value), (_, published) in zip(top, self._top)
+        ):
+            return False
+        self._top = top
+        names = [self._devices[unique_id].name for unique_id, _ in top]
+        self._attr_native_value = names[0] if names else None
+        self._attr_extra_state_attributes = {
+            ATTR_RANKING: [
+                {"rank": rank, "name": name, ATTR_COEFFICIENT: value}
+                for rank, (name, (_, value)) in enumerate(zip(names, top), 1)
+            ]
+        }
+        return True
+
+
+@dataclass(slots=True)
 class ComputeState:
     """Thermal Comfort Calculation State."""
 
@@ -319,20 +657,135 @@ class ComputeState:
     lock: Lock = None
 
 
+class SharedTemperatureSource:
+    """Temperature sensor whose state changes are fanned out to several devices.
+
+    Used by multi-room config entries so that one outdoor sensor is parsed and
+    subscribed to once, however many rooms depend on it. Other numeric sensors,
+    such as wind speed, are shared the same way by passing their convert.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_id: str,
+        convert: Callable[[HomeAssistant, State | None], float | None] | None = None,
+    ) -> None:
+        """Initialize the source."""
+        self.hass = hass
+        self.entity_id = entity_id
+        self._convert = _state_to_celsius if convert is None else convert
+        self._listeners: list[Callable[[float, float], Awaitable[None]]] = []
+
+    def add_listener(
+        self, listener: Callable[[float, float], Awaitable[None]]
+    ) -> None:
+        """Register a coroutine called with every new temperature in celsius.
+
+        The listener also receives the POSIX timestamp of the reading.
+        """
+        self._listeners.append(listener)
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Subscribe to the sensor and return the unsubscribe callback."""
+        self.hass.async_create_task(
+            self._new_temperature_state(self.hass.states.get(self.entity_id))
+        )
+        return async_track_state_change_event(
+            self.hass, self.entity_id, self.temperature_state_listener
+        )
+
+    async def temperature_state_listener(self, event):
+        """Handle temperature device state changes."""
+        await self._new_temperature_state(event.data.get("new_state"))
+
+    async def _new_temperature_state(self, state):
+        temperature = self._convert(self.hass, state)
+        if temperature is not None:
+            timestamp = state.last_updated.timestamp()
+            for listener in self._listeners:
+                await listener(temperature, timestamp)
+
+
 class DeviceHeatTransfer:
     """Representation of a Heat Transfer Sensor."""
 
+    __slots__ = (
+        "hass",
+        "_unique_id",
+        "_device_info",
+        "extra_state_attributes",
+        "_in_temp_sensor_entities",
+        "_out_temp_sensor_entity",
+        "_out_temp_source",
+        "_regressor_sources",
+        "_engine",
+        "_statistics",
+        "_significant_change",
+        "_published_value",
+        "_should_poll",
+        "_scan_interval",
+        "_adaptive_scan_interval",
+        "_cancel_refresh",
+        "_archive",
+        "_archive_writer",
+        "_climate_entity",
+        "_heater_entity",
+        "_sample_listeners",
+        "_update_listeners",
+        "sensors",
+        "_weather_entity",
+        "_forecast_time",
+        "_forecast",
+        "_forecast_coefficient",
+        "_forecast_result",
+        "_compute_states",
+        "_heat_transfer_coefficient",
+        "_indoor_temperature_forecast",
+        "_heating_degree_days",
+        "_heat_loss_energy",
+        "_restored_totals",
+    )
+
     def __init__(
         self,
         hass: HomeAssistant,
         name: str,
         unique_id: str,
-        in_temp_sensor_entity: str,
+        in_temp_sensor_entity: str | list[str],
         out_temp_sensor_entity: str,
         should_poll: bool,
         scan_interval: timedelta,
+        adaptive_scan_interval: bool = ADAPTIVE_SCAN_INTERVAL_DEFAULT,
+        max_scan_interval: timedelta = timedelta(seconds=MAX_SCAN_INTERVAL_DEFAULT),
+        sample_period: timedelta = timedelta(seconds=SAMPLE_PERIOD_DEFAULT),
+        resample_method: str = RESAMPLE_METHOD_DEFAULT,
+        estimator: str = ESTIMATOR_DEFAULT,
+        estimator_window: int = ESTIMATOR_WINDOW_DEFAULT,
+        forgetting_factor: float = FORGETTING_FACTOR_DEFAULT,
+        statistics: bool = STATISTICS_DEFAULT,
+        significant_change: float = SIGNIFICANT_CHANGE_DEFAULT,
+        archive: bool = ARCHIVE_DEFAULT,
+        climate_entity: str | None = None,
+        heater_entity: str | None = None,
+        change_detection: bool = CHANGE_DETECTION_DEFAULT,
+        weather_entity: str | None = None,
+        forecast_time: time | str = FORECAST_TIME_DEFAULT,
+        base_temperature: float = BASE_TEMPERATURE_DEFAULT,
+        thermal_mass: float = THERMAL_MASS_DEFAULT,
+        wind_speed_source: SharedTemperatureSource | None = None,
+        irradiance_source: SharedTemperatureSource | None = None,
+        out_temp_source: SharedTemperatureSource | None = None,
+        via_device: str | None = None,
     ):
-        """Initialize the sensor."""
+        """Initialize the sensor.
+
+        Nothing is subscribed until async_start is called. Several indoor
+        sensors are fused into a single indoor series. The wind speed and
+        irradiance sources are only used by the multivariate estimator and are
+        started by the caller, as the outdoor source is.
+        """
         self.hass = hass
         self._unique_id = unique_id
         self._device_info = DeviceInfo(
@@ -341,43 +794,266 @@ class DeviceHeatTransfer:
             manufacturer=DEFAULT_NAME,
             model="Virtual Device",
         )
+        if via_device is not None:
+            self._device_info["via_device"] = (DOMAIN, via_device)
         self.extra_state_attributes = {}
-        self._in_temp_sensor_entity = in_temp_sensor_entity
+        self._in_temp_sensor_entities = as_entity_list(in_temp_sensor_entity)
         self._out_temp_sensor_entity = out_temp_sensor_entity
-        self._in_temp = None
-        self._out_temp = None
+        self._out_temp_source = out_temp_source
+        if EstimatorType(estimator) is not EstimatorType.MULTIVARIATE_RLS:
+            wind_speed_source = irradiance_source = None
+        # Extra aligner channels, in the order the estimator expects them.
+        self._regressor_sources = [
+            source
+            for source in (wind_speed_source, irradiance_source)
+            if source is not None
+        ]
+        self._engine = HeatTransferEngine(
+            sample_period=sample_period.total_seconds(),
+            resample_method=resample_method,
+            estimator=estimator,
+            estimator_window=estimator_window,
+            forgetting_factor=forgetting_factor,
+            wind_speed=wind_speed_source is not None,
+            irradiance=irradiance_source is not None,
+            fused=len(self._in_temp_sensor_entities) > 1,
+            segmented=bool(climate_entity or heater_entity),
+            change_detection=change_detection,
+            statistics=statistics,
+            time_zone=dt_util.DEFAULT_TIME_ZONE,
+            base_temperature=base_temperature,
+            thermal_mass=thermal_mass,
+            on_sample=self._on_sample,
+            on_change_point=self._on_change_point if change_detection else None,
+            on_statistics=self._publish_statistics if statistics else None,
+        )
+        self._statistics = statistics
+        self._significant_change = significant_change / 100
+        self._published_value = None
+        # Created in async_start, where the configuration directory is known.
+        self._archive = archive
+        # Task writing the latest batch, which the next batch waits for.
+        self._archive_writer = None
+        self._climate_entity = climate_entity
+        self._heater_entity = heater_entity
         self._should_poll = should_poll
+        if scan_interval is None:
+            scan_interval = timedelta(seconds=SCAN_INTERVAL_DEFAULT)
+        self._scan_interval = scan_interval
+        self._adaptive_scan_interval = (
+            AdaptiveScanInterval(
+                scan_interval.total_seconds(), max_scan_interval.total_seconds()
+            )
+            if adaptive_scan_interval
+            else None
+        )
+        self._cancel_refresh = None
+        self._sample_listeners = []
+        self._update_listeners = []
+        self._weather_entity = weather_entity
+        self._forecast_time = (
+            dt_util.parse_time(forecast_time)
+            if isinstance(forecast_time, str)
+            else forecast_time
+        )
+        self._forecast = []
+        self._forecast_coefficient = None
+        self._forecast_result = None
+        self._restored_totals = ()
         self.sensors = []
+        # One lock per device is enough as computations never interleave.
+        lock = Lock()
         self._compute_states = {
-            sensor_type: ComputeState(lock=Lock())
+            sensor_type: ComputeState(lock=lock)
             for sensor_type in SENSOR_TYPES.keys()
         }
 
-        async_track_state_change_event(
-            self.hass, self._in_temp_sensor_entity, self.temperature_state_listener
-        )
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Subscribe to the temperature sensors and return the unsubscribe callback."""
+        hass = self.hass
+        unsubscribes = [
+            async_track_state_change_event(
+                hass, self._in_temp_sensor_entities, self.temperature_state_listener
+            )
+        ]
+        for entity_id in self._in_temp_sensor_entities:
+            hass.async_create_task(
+                self._new_temperature_state(entity_id, hass.states.get(entity_id))
+            )
+        if self._out_temp_source is None:
+            unsubscribes.append(
+                async_track_state_change_event(
+                    hass, self._out_temp_sensor_entity, self.temperature_state_listener
+                )
+            )
+            hass.async_create_task(
+                self._new_temperature_state(
+                    self._out_temp_sensor_entity,
+                    hass.states.get(self._out_temp_sensor_entity),
+                )
+            )
+        else:
+            self._out_temp_source.add_listener(self.async_set_out_temp)
+        for channel, source in enumerate(self._regressor_sources, OUT_CHANNEL + 1):
+            source.add_listener(partial(self._async_add_reading, channel))
+
+        hass.async_create_task(self._set_version())
+        devices = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_DEVICES, {})
+        devices[self._unique_id] = self
+
+        if self._weather_entity is not None:
+            unsubscribes.append(
+                async_track_state_change_event(
+                    hass, self._weather_entity, self.weather_state_listener
+                )
+            )
+            hass.async_create_task(
+                self._async_update_forecast(hass.states.get(self._weather_entity))
+            )
+
+        if self._climate_entity or self._heater_entity:
+            heating_entities = [
+                entity_id
+                for entity_id in (self._climate_entity, self._heater_entity)
+                if entity_id
+            ]
+            unsubscribes.append(
+                async_track_state_change_event(
+                    hass, heating_entities, self.heating_state_listener
+                )
+            )
+            hass.async_create_task(self._async_update_heating(dt_util.utcnow()))
+
+        if self._archive:
+            self._archive = SampleArchive(
+                hass.config.path(DOMAIN, f"{slugify(self._unique_id)}.bin")
+            )
+            hass.async_create_task(self._async_bootstrap())
+            unsubscribes.append(
+                hass.bus.async_listen_once(
+                    EVENT_HOMEASSISTANT_STOP, self._async_flush_archive
+                )
+            )
+
+        if self._should_poll and self._adaptive_scan_interval is not None:
+            self._cancel_refresh = async_call_later(
+                hass, self._scan_interval, self._async_adaptive_refresh
+            )
+        elif self._should_poll:
+            unsubscribes.append(
+                async_track_time_interval(
+                    hass,
+                    self.async_update_sensors,
+                    self._scan_interval,
+                )
+            )
 
-        async_track_state_change_event(
-            self.hass, self._out_temp_sensor_entity, self.temperature_state_listener
+        @callback
+        def _unsubscribe() -> None:
+            if devices.get(self._unique_id) is self:
+                del devices[self._unique_id]
+            for unsubscribe in unsubscribes:
+                unsubscribe()
+            if self._cancel_refresh is not None:
+                self._cancel_refresh()
+                self._cancel_refresh = None
+            if self._archive:
+                self._async_flush_archive()
+
+        return _unsubscribe
+
+    async def weather_state_listener(self, event):
+        """Handle weather forecast changes."""
+        await self._async_update_forecast(event.data.get("new_state"))
+
+    async def _async_update_forecast(self, state) -> None:
+        forecast = _state_to_forecast(self.hass, state)
+        if forecast == self._forecast:
+            return
+        self._forecast = forecast
+        self._forecast_result = None
+        self._compute_states[SensorType.INDOOR_TEMPERATURE_FORECAST].needs_update = True
+        if not self._should_poll:
+            await self.async_update_sensors(True)
+
+    async def heating_state_listener(self, event):
+        """Handle climate and heater state changes."""
+        new_state = event.data.get("new_state")
+        await self._async_update_heating(
+            dt_util.utcnow() if new_state is None else new_state.last_updated
         )
 
-        hass.async_create_task(
-            self._new_temperature_state(hass.states.get(in_temp_sensor_entity))
+    async def _async_update_heating(self, changed: datetime) -> None:
+        """Open or close a cooling segment from the current heating state."""
+        heating = [
+            _is_heating(self.hass.states.get(entity_id))
+            for entity_id in (self._climate_entity, self._heater_entity)
+            if entity_id
+        ]
+        if any(heating):
+            is_heating = True
+        elif all(state is None for state in heating):
+            is_heating = None
+        else:
+            is_heating = False
+        if self._engine.set_heating(changed.timestamp(), is_heating):
+            await self.async_update()
+
+    async def _async_bootstrap(self) -> None:
+        """Rebuild the estimate from archived samples."""
+        if not self._engine.bootstrap_size:
+            return
+        # Replayed on a copy, as live samples may reach the engine meanwhile.
+        estimator = copy.deepcopy(self._engine.estimator)
+        count = await self.hass.async_add_executor_job(
+            _replay_archive, self._archive, estimator, self._engine.bootstrap_size
         )
-        hass.async_create_task(
-            self._new_temperature_state(hass.states.get(out_temp_sensor_entity))
+        if self._engine.sample is not None:
+            # Live samples arrived first; replaying older ones would mix them up.
+            return
+        self._engine.bootstrap(estimator)
+        if count:
+            LOGGER.debug(
+                "%s: estimator bootstrapped from %d archived samples",
+                self.name,
+                count,
+            )
+            await self.async_update()
+
+    @callback
+    def _async_flush_archive(self, _event: Event | None = None) -> None:
+        """Write the buffered samples to the archive after the earlier batches."""
+        self._archive_writer = self.hass.async_create_task(
+            self._async_write_archive(
+                self._archive_writer, self._archive.take_batch()
+            )
         )
 
-        hass.async_create_task(self._set_version())
+    async def _async_write_archive(
+        self, previous: asyncio.Task | None, batch: bytes
+    ) -> None:
+        # Reads binary search the file, so batches must land in time order.
+        if previous is not None:
+            await asyncio.wait((previous,))
+        try:
+            await self.hass.async_add_executor_job(self._archive.write, batch)
+        except OSError as err:
+            LOGGER.error("%s: failed to write the sample archive: %s", self.name, err)
 
-        if self._should_poll:
-            if scan_interval is None:
-                scan_interval = timedelta(seconds=SCAN_INTERVAL_DEFAULT)
-            async_track_time_interval(
-                self.hass,
-                self.async_update_sensors,
-                scan_interval,
-            )
+    async def _async_adaptive_refresh(self, now: datetime) -> None:
+        """Refresh the sensors and schedule the next refresh."""
+        self._cancel_refresh = None
+        await self.async_update_sensors(True)
+        sample = self._engine.sample
+        interval = self._adaptive_scan_interval.update(
+            now.timestamp(),
+            self._engine.coefficient,
+            None if sample is None else sample[2] - sample[1],
+        )
+        self._cancel_refresh = async_call_later(
+            self.hass, interval, self._async_adaptive_refresh
+        )
 
     async def _set_version(self):
         self._device_info["sw_version"] = (
@@ -386,37 +1062,304 @@ class DeviceHeatTransfer:
 
     async def temperature_state_listener(self, event):
         """Handle temperature device state changes."""
-        await self._new_temperature_state(event.data.get("new_state"))
+        await self._new_temperature_state(
+            event.data.get("entity_id"), event.data.get("new_state")
+        )
 
-    async def _new_temperature_state(self, state):
-        if _is_valid_state(state):
-            hass = self.hass
-            unit = state.attributes.get(
-                ATTR_UNIT_OF_MEASUREMENT,
-                hass.config.units.temperature_unit
-            )
-            temp = util.convert(state.state, float)
-            # convert to celsius if necessary
-            temperature = TemperatureConverter.convert(temp, unit, UnitOfTemperature.CELSIUS)
-            if -89.2 <= temperature <= 56.7:
-                self.extra_state_attributes[ATTR_TEMPERATURE] = temp
-                self._temperature = temperature
-                await self.async_update()
-        else:
-            LOGGER.info("Temperature has an invalid value: %s. Can't calculate new states.", state)
+    async def _new_temperature_state(self, entity_id, state):
+        temperature = _state_to_celsius(self.hass, state)
+        if temperature is None:
+            if entity_id in self._in_temp_sensor_entities:
+                self._engine.unfuse(entity_id)
+            return
+        timestamp = state.last_updated.timestamp()
+        if entity_id == self._out_temp_sensor_entity:
+            await self.async_set_out_temp(temperature, timestamp)
+        elif entity_id in self._in_temp_sensor_entities:
+            temperature = self._engine.fuse(entity_id, timestamp, temperature)
+            self.extra_state_attributes[ATTR_TEMPERATURE] = temperature
+            await self.async_set_in_temp(temperature, timestamp)
+
+    async def async_set_in_temp(self, temperature: float, timestamp: float) -> None:
+        """Add an indoor temperature in celsius read at a POSIX timestamp."""
+        await self._async_add_reading(IN_CHANNEL, temperature, timestamp)
+
+    async def async_set_out_temp(self, temperature: float, timestamp: float) -> None:
+        """Add an outdoor temperature in celsius read at a POSIX timestamp."""
+        await self._async_add_reading(OUT_CHANNEL, temperature, timestamp)
+
+    async def _async_add_reading(
+        self, channel: int, temperature: float, timestamp: float
+    ) -> None:
+        sample = self._engine.sample
+        if self._engine.add_reading(channel, timestamp, temperature):
+            await self.async_update()
+        elif self._engine.sample is not sample:
+            await self._async_update_totals()
+
+    def _on_sample(self, sample: tuple[float, ...]) -> None:
+        """Pass an aligned sample consumed by the engine on to listeners."""
+        for sensor_type in TOTAL_SENSOR_TYPES:
+            self._compute_states[sensor_type].needs_update = True
+        for listener in self._sample_listeners:
+            listener(sample)
+        if self._archive and self._archive.append(sample):
+            self._async_flush_archive()
+
+    def _on_change_point(
+        self, stream: str, direction: int, sample: tuple[float, ...]
+    ) -> None:
+        """Announce a change point after which the engine restarted its estimate."""
+        LOGGER.debug("%s: change point in %s", self.name, stream)
+        self.hass.bus.async_fire(
+            EVENT_CHANGE_POINT,
+            {
+                "unique_id": self._unique_id,
+                "name": self.name,
+                "stream": stream,
+                "direction": "increase" if direction > 0 else "decrease",
+                "timestamp": sample[0],
+            },
+        )
+
+    def _publish_statistics(self, period: str, bucket: StatisticsBucket) -> None:
+        """Add a completed bucket to the recorder as an external statistic."""
+        # Only needed when statistics are enabled, so imported on demand.
+        # pylint: disable=import-outside-toplevel
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        for sensor in self.sensors:
+            # The statistics are of the coefficient, so only its sensor counts.
+            if sensor.sensor_type is SensorType.HEAT_TRANSFER_COEFFICIENT:
+                sensor.set_attribute(f"{period}_count", bucket.count)
+        metadata = StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=f"{self.name} {period}",
+            source=DOMAIN,
+            statistic_id=f"{DOMAIN}:{slugify(self._unique_id)}_{period}",
+            unit_of_measurement=SENSOR_TYPES[
+                SensorType.HEAT_TRANSFER_COEFFICIENT
+            ]["native_unit_of_measurement"],
+        )
+        async_add_external_statistics(
+            self.hass,
+            metadata,
+            [
+                StatisticData(
+                    start=dt_util.utc_from_timestamp(bucket.start),
+                    mean=bucket.mean,
+                    min=bucket.minimum,
+                    max=bucket.maximum,
+                )
+            ],
+        )
+
+    def _is_significant_change(self) -> bool:
+        """Return whether the coefficient moved enough to be written as state.
+
+        Every change is significant unless long-term statistics are recorded.
+        """
+        if not self._statistics:
+            return True
+        value = self._engine.coefficient
+        if value is None:
+            return False
+        published = self._published_value
+        if (
+            published is not None
+            and abs(value - published) <= self._significant_change * abs(published)
+        ):
+            return False
+        self._published_value = value
+        return True
 
     @compute_once_lock(SensorType.HEAT_TRANSFER_COEFFICIENT)
     async def heat_transfer_coefficient(self) -> float:
         """Heat transfer coefficient
         <https://en.wikipedia.org/wiki/Newton's_law_of_cooling#Simplified_formulation>.
         """
-        return self._out_temp - self._in_temp
+        return self._engine.coefficient
+
+    @compute_once_lock(SensorType.INDOOR_TEMPERATURE_FORECAST)
+    async def indoor_temperature_forecast(self) -> tuple[float, list[dict]] | None:
+        """Indoor temperature at the next forecast time and its trajectory.
+
+        Only recomputed when the weather forecast changes, the coefficient
+        moves by more than FORECAST_RECOMPUTE_CHANGE or the forecast time
+        passes.
+        """
+        coefficient = self._engine.coefficient
+        sample = self._engine.sample
+        if (
+            not self._forecast
+            or sample is None
+            or not self.fits_coefficient
+            or coefficient is None
+            or coefficient <= 0
+        ):
+            return None
+        result = self._forecast_result
+        if (
+            result is not None
+            and sample[0] < result[0]
+            and abs(coefficient - self._forecast_coefficient)
+            <= FORECAST_RECOMPUTE_CHANGE * self._forecast_coefficient
+        ):
+            return result[1:]
+
+        start, in_temp, out_temp = sample[:3]
+        outdoor = [(start, out_temp)]
+        outdoor.extend(point for point in self._forecast if point[0] > start)
+        now = dt_util.as_local(dt_util.utc_from_timestamp(start))
+        target = now.replace(
+            hour=self._forecast_time.hour,
+            minute=self._forecast_time.minute,
+            second=self._forecast_time.second,
+            microsecond=0,
+        )
+        if target <= now:
+            target += timedelta(days=1)
+        target = target.timestamp()
+        if (out_target := interpolate(outdoor, target)) is not None:
+            bisect.insort(outdoor, (target, out_target))
+        trajectory = predict_indoor_temperature(coefficient, in_temp, outdoor)
+        value = interpolate(trajectory, target)
+        self._forecast_coefficient = coefficient
+        self._forecast_result = result = (
+            target,
+            None if value is None else round(value, DISPLAY_PRECISION),
+            [
+                {
+                    ATTR_FORECAST_TIME: dt_util.utc_from_timestamp(timestamp).isoformat(),
+                    ATTR_FORECAST_TEMPERATURE: round(temperature, DISPLAY_PRECISION),
+                }
+                for timestamp, temperature in trajectory
+            ],
+        )
+        return result[1:]
+
+    @compute_once_lock(SensorType.HEATING_DEGREE_DAYS)
+    async def heating_degree_days(self) -> float:
+        """Heating degree days below the base temperature since the start."""
+        return self._total(SensorType.HEATING_DEGREE_DAYS)
+
+    @compute_once_lock(SensorType.HEAT_LOSS_ENERGY)
+    async def heat_loss_energy(self) -> float | None:
+        """Heat lost in kWh since the start, from the coefficient and thermal mass."""
+        return self._total(SensorType.HEAT_LOSS_ENERGY)
+
+    def _total(self, sensor_type: SensorType) -> float | None:
+        """Return a total rounded as it is written."""
+        if sensor_type is SensorType.HEATING_DEGREE_DAYS:
+            value = self._engine.degree_days
+        else:
+            value = self._engine.energy
+        return None if value is None else round(value, TOTAL_PRECISION)
+
+    def restore_total(self, sensor_type: SensorType, value: float) -> None:
+        """Carry the total of a sensor over from before a restart.
+
+        Only the first value restored for each sensor type is used, as an
+        entity re-added under a new entity_id restores the total it wrote.
+        """
+        if sensor_type in self._restored_totals:
+            return
+        self._restored_totals += (sensor_type,)
+        if sensor_type is SensorType.HEATING_DEGREE_DAYS:
+            self._engine.restore_totals(degree_days=value)
+        elif sensor_type is SensorType.HEAT_LOSS_ENERGY:
+            self._engine.restore_totals(energy=value)
+        self._compute_states[sensor_type].needs_update = True
+
+    async def _async_update_totals(self) -> None:
+        """Write the totals, which grow with every sample whatever the estimate.
+
+        Only the total sensors are refreshed, so the others keep to the
+        significant change rule, and only once their rounded value moves.
+        """
+        if self._should_poll:
+            return
+        for sensor in self.sensors:
+            if isinstance(
+                sensor, SensorHeatTransferTotal
+            ) and sensor.native_value != self._total(sensor.sensor_type):
+                sensor.async_schedule_update_ha_state(True)
+
+    @property
+    def sensor_types(self) -> list[SensorType]:
+        """Return the sensor types this device provides."""
+        return [
+            sensor_type
+            for sensor_type in SensorType
+            if (
+                sensor_type is not SensorType.INDOOR_TEMPERATURE_FORECAST
+                or self._weather_entity is not None
+            )
+            and (
+                sensor_type is not SensorType.HEAT_LOSS_ENERGY
+                or self._engine.energy is not None
+            )
+        ]
+
+    @callback
+    def async_subscribe_samples(
+        self, listener: Callable[[tuple[float, ...]], None]
+    ) -> CALLBACK_TYPE:
+        """Call listener with every aligned sample until unsubscribed."""
+        self._sample_listeners.append(listener)
+
+        @callback
+        def _unsubscribe() -> None:
+            self._sample_listeners.remove(listener)
+
+        return _unsubscribe
+
+    @callback
+    def async_subscribe_updates(
+        self, listener: Callable[["DeviceHeatTransfer"], None]
+    ) -> CALLBACK_TYPE:
+        """Call listener with the device whenever its sensors are updated."""
+        self._update_listeners.append(listener)
+
+        @callback
+        def _unsubscribe() -> None:
+            self._update_listeners.remove(listener)
+
+        return _unsubscribe
+
+    async def async_recent_samples(self, count: int) -> list[tuple[float, ...]]:
+        """Return up to count of the latest aligned samples.
+
+        History is only kept in the archive, so without one this is at most
+        the latest sample.
+        """
+        if isinstance(self._archive, SampleArchive):
+            samples = await self.hass.async_add_executor_job(
+                self._archive.tail, count
+            )
+            samples += self._archive.buffered()
+            return samples[-count:]
+        if self._engine.sample is None:
+            return []
+        return [self._engine.sample[:3]]
 
     async def async_update(self):
         """Update the state."""
-        if self._in_temp is not None and self._out_temp is not None:
+        if self._engine.sample is not None:
+            if not self._is_significant_change():
+                await self._async_update_totals()
+                return
             for sensor_type in SENSOR_TYPES.keys():
                 self._compute_states[sensor_type].needs_update = True
+            for listener in self._update_listeners:
+                listener(self)
             if not self._should_poll:
                 await self.async_update_sensors(True)
 
@@ -430,6 +1373,16 @@ class DeviceHeatTransfer:
         """Compute states of configured sensors."""
         return self._compute_states
 
+    @property
+    def coefficient(self) -> float | None:
+        """Return the current estimate of the coefficient."""
+        return self._engine.coefficient
+
+    @property
+    def fits_coefficient(self) -> bool:
+        """Return whether the coefficient is k of a fitted Newton cooling line."""
+        return isinstance(self._engine.estimator, NewtonEstimator)
+
     @property
     def unique_id(self) -> str:
         """Return a unique ID."""
@@ -446,6 +1399,80 @@ class DeviceHeatTransfer:
         return self._device_info["name"]
 
 
+def _state_to_celsius(hass: HomeAssistant, state) -> float | None:
+    """Return the temperature of a state in celsius, or None if unusable."""
+    if not _is_valid_state(state):
+        LOGGER.info("Temperature has an invalid value: %s. Can't calculate new states.", state)
+        return None
+    unit = state.attributes.get(
+        ATTR_UNIT_OF_MEASUREMENT,
+        hass.config.units.temperature_unit
+    )
+    temp = util.convert(state.state, float)
+    # convert to celsius if necessary
+    temperature = TemperatureConverter.convert(temp, unit, UnitOfTemperature.CELSIUS)
+    if -89.2 <= temperature <= 56.7:
+        return temperature
+    return None
+
+
+def _state_to_wind_speed(hass: HomeAssistant, state) -> float | None:
+    """Return the wind speed of a state in m/s, or None if unusable."""
+    if not _is_valid_state(state):
+        return None
+    speed = float(state.state)
+    unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+    if unit in SpeedConverter.VALID_UNITS:
+        speed = SpeedConverter.convert(speed, unit, UnitOfSpeed.METERS_PER_SECOND)
+    return speed if speed >= 0 else None
+
+
+def _state_to_irradiance(hass: HomeAssistant, state) -> float | None:
+    """Return the irradiance of a state in W/m², or None if unusable."""
+    if not _is_valid_state(state):
+        return None
+    irradiance = float(state.state)
+    return irradiance if irradiance >= 0 else None
+
+
+def _state_to_forecast(hass: HomeAssistant, state) -> list[tuple[float, float]]:
+    """Return the (timestamp, celsius) forecast points of a weather state."""
+    if state is None:
+        return []
+    unit = state.attributes.get(
+        ATTR_TEMPERATURE_UNIT, hass.config.units.temperature_unit
+    )
+    forecast = []
+    for item in state.attributes.get(ATTR_FORECAST) or ():
+        timestamp = item.get(ATTR_FORECAST_TIME)
+        temperature = item.get(ATTR_FORECAST_TEMPERATURE)
+        if isinstance(timestamp, str):
+            timestamp = dt_util.parse_datetime(timestamp)
+        if timestamp is None or temperature is None:
+            continue
+        forecast.append(
+            (
+                timestamp.timestamp(),
+                TemperatureConverter.convert(
+                    float(temperature), unit, UnitOfTemperature.CELSIUS
+                ),
+            )
+        )
+    forecast.sort()
+    return forecast
+
+
+def _is_heating(state) -> bool | None:
+    """Return whether a climate or heater state is heating, None if unknown."""
+    if state is None or state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+        return None
+    if state.domain == CLIMATE_DOMAIN:
+        if (hvac_action := state.attributes.get(ATTR_HVAC_ACTION)) is not None:
+            return hvac_action == HVAC_ACTION_HEATING
+        return state.state == HVAC_MODE_HEAT
+    return state.state == STATE_ON
+
+
 def _is_valid_state(state) -> bool:
     if state is not None:
         if state.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE):
@@ -453,4 +1480,13 @@ def _is_valid_state(state) -> bool:
                 return not math.isnan(float(state.state))
             except ValueError:
                 pass
-    return False
\ No newline at end of file
+    return False
+
+def _replay_archive(archive: SampleArchive, estimator, count: int) -> int:
+    """Feed the last count archived samples to an estimator, in an executor.
+
+    :returns: the number of samples replayed
+    """
+    samples = archive.tail(count)
+    replay_estimator(estimator, samples)
+    return len(samples)
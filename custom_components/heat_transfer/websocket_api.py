@@ -0,0 +1,207 @@
+"""WebSocket API streaming live fit data of heat_transfer devices to dashboards.
+
+Keeps sample series off the state machine: a card subscribes to one device,
+receives a downsampled snapshot and then throttled batches of new samples.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+import time
+from typing import Any
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry
+from homeassistant.helpers.event import async_call_later
+import voluptuous as vol
+
+from .const import (
+    DATA_DEVICES,
+    DOMAIN,
+    WEBSOCKET_HISTORY,
+    WEBSOCKET_MAX_POINTS,
+    WEBSOCKET_THROTTLE,
+)
+
+
+@callback
+def async_register_commands(hass: HomeAssistant) -> None:
+    """Register the heat_transfer websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+def downsample(
+    samples: Sequence[tuple[float, ...]], threshold: int
+) -> list[tuple[float, ...]]:
+    """Downsample (timestamp, indoor, outdoor, ...) samples with LTTB.
+
+    Largest-Triangle-Three-Buckets keeps the first and last samples and, from
+    each of threshold - 2 buckets in between, the sample forming the largest
+    triangle with the sample kept from the previous bucket and the mean of the
+    next bucket. The areas of the indoor and outdoor series are added so both
+    keep their shape. O(len(samples)).
+    """
+    count = len(samples)
+    if threshold >= count or threshold < 3:
+        return list(samples)
+    bucket_size = (count - 2) / (threshold - 2)
+    kept = [samples[0]]
+    previous = samples[0]
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        stop = int((bucket + 1) * bucket_size) + 1
+        next_stop = min(int((bucket + 2) * bucket_size) + 1, count)
+        following = samples[stop:next_stop] or samples[-1:]
+        mean_t = sum(sample[0] for sample in following) / len(following)
+        mean_in = sum(sample[1] for sample in following) / len(following)
+        mean_out = sum(sample[2] for sample in following) / len(following)
+        best = None
+        best_area = -1.0
+        for sample in samples[start:stop]:
+            area = abs(
+                (previous[0] - mean_t) * (sample[1] - previous[1])
+                - (previous[0] - sample[0]) * (mean_in - previous[1])
+            ) + abs(
+                (previous[0] - mean_t) * (sample[2] - previous[2])
+                - (previous[0] - sample[0]) * (mean_out - previous[2])
+            )
+            if area > best_area:
+                best = sample
+                best_area = area
+        kept.append(best)
+        previous = best
+    kept.append(samples[-1])
+    return kept
+
+
+class _SampleStream:
+    """Forwards a device's samples to one subscription at most every throttle."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        device: Any,
+        max_points: int,
+    ) -> None:
+        """Initialize the stream."""
+        self._hass = hass
+        self._connection = connection
+        self._msg_id = msg_id
+        self._device = device
+        self._max_points = max_points
+        self._pending: list[tuple[float, ...]] = []
+        self._snapshot_sent = False
+        self._last_sent = 0.0
+        self._cancel_flush: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_sample(self, sample: tuple[float, ...]) -> None:
+        """Queue a new sample, flushing once the throttle period has passed."""
+        self._pending.append(sample)
+        if not self._snapshot_sent or self._cancel_flush is not None:
+            return
+        delay = self._last_sent + WEBSOCKET_THROTTLE - time.monotonic()
+        self._cancel_flush = async_call_later(
+            self._hass, max(delay, 0), self._async_flush
+        )
+
+    @callback
+    def async_send_snapshot(self, samples: list[tuple[float, ...]]) -> None:
+        """Send the initial snapshot, including samples queued meanwhile."""
+        if self._pending:
+            # Live samples already queued are newer than anything archived.
+            first = self._pending[0][0]
+            samples = [sample for sample in samples if sample[0] < first]
+            samples += self._pending
+            self._pending = []
+        self._send(samples)
+        self._snapshot_sent = True
+
+    @callback
+    def async_cancel(self) -> None:
+        """Stop any scheduled flush."""
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+
+    @callback
+    def _async_flush(self, _now) -> None:
+        self._cancel_flush = None
+        samples = self._pending
+        self._pending = []
+        self._send(samples)
+
+    def _send(self, samples: list[tuple[float, ...]]) -> None:
+        self._last_sent = time.monotonic()
+        coefficient = self._device.coefficient
+        self._connection.send_message(
+            websocket_api.event_message(
+                self._msg_id,
+                {
+                    "samples": [
+                        sample[:3]
+                        for sample in downsample(samples, self._max_points)
+                    ],
+                    "coefficient": coefficient,
+                    # Fit of the indoor rate of change against dT, which only
+                    # estimators of k make.
+                    "fit_line": None
+                    if coefficient is None or not self._device.fits_coefficient
+                    else {"slope": coefficient, "intercept": 0.0},
+                },
+            )
+        )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe",
+        vol.Required("device_id"): str,
+        vol.Optional("max_points", default=WEBSOCKET_MAX_POINTS): vol.All(
+            vol.Coerce(int), vol.Range(min=3, max=WEBSOCKET_HISTORY)
+        ),
+    }
+)
+@websocket_api.async_response
+async def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Subscribe to the aligned samples and coefficient of a device.
+
+    Every event holds (timestamp, indoor, outdoor) samples, the coefficient and
+    the fitted line. The first one is a downsampled snapshot of recent samples.
+    """
+    device = None
+    entry = device_registry.async_get(hass).async_get(msg["device_id"])
+    if entry is not None:
+        devices = hass.data.get(DOMAIN, {}).get(DATA_DEVICES, {})
+        device = next(
+            (
+                devices[unique_id]
+                for domain, unique_id in entry.identifiers
+                if domain == DOMAIN and unique_id in devices
+            ),
+            None,
+        )
+    if device is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Device not found"
+        )
+        return
+
+    stream = _SampleStream(hass, connection, msg["id"], device, msg["max_points"])
+    # Subscribe first so no sample is lost while the snapshot is read.
+    unsubscribe = device.async_subscribe_samples(stream.async_add_sample)
+
+    @callback
+    def _unsubscribe() -> None:
+        unsubscribe()
+        stream.async_cancel()
+
+    connection.subscriptions[msg["id"]] = _unsubscribe
+    connection.send_result(msg["id"])
+    stream.async_send_snapshot(await device.async_recent_samples(WEBSOCKET_HISTORY))
@@ -0,0 +1,237 @@
+"""Replay recorded temperature traces through the heat_transfer engine offline.
+
+Indoor and outdoor traces are streamed from CSV files, or Parquet files when
+pyarrow is installed, merged in time order and fed through the same ingest,
+alignment and estimator code as the integration under a simulated clock. The
+coefficient computed for every aligned sample is written as CSV and the
+throughput is reported on stderr.
+
+Traces need a timestamp column (timestamp, last_changed, last_updated or time;
+POSIX seconds or ISO 8601) and a value column (value, state or temperature) in
+degrees celsius, which is what the Home Assistant history export produces.
+Alternatively a device's sample archive can be replayed with --archive.
+
+Home Assistant is not needed, only the engine module is imported:
+
+    python scripts/replay.py indoor.csv outdoor.csv --estimator rls --speed 0
+    python scripts/replay.py --archive config/heat_transfer/living_room.bin
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+from collections.abc import Iterator
+from datetime import datetime
+import heapq
+import math
+import os
+import sys
+import time
+
+# Importing the engine on its own keeps Home Assistant out of the process.
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(__file__), "..", "custom_components", "heat_transfer"
+    ),
+)
+
+# pylint: disable=wrong-import-position
+from engine import (  # noqa: E402
+    ESTIMATOR_DEFAULT,
+    ESTIMATOR_WINDOW_DEFAULT,
+    FORGETTING_FACTOR_DEFAULT,
+    IN_CHANNEL,
+    OUT_CHANNEL,
+    RESAMPLE_METHOD_DEFAULT,
+    SAMPLE_PERIOD_DEFAULT,
+    EstimatorType,
+    HeatTransferEngine,
+    ResampleMethod,
+    SampleArchive,
+)
+
+TIMESTAMP_COLUMNS = ("timestamp", "last_changed", "last_updated", "time")
+VALUE_COLUMNS = ("value", "state", "temperature")
+
+
+class SimulatedClock:
+    """Clock following the replayed timestamps at a multiple of real time.
+
+    A speed of 0 replays as fast as possible.
+    """
+
+    def __init__(self, speed: float) -> None:
+        """Initialize the clock."""
+        self._speed = speed
+        self._start = None
+        self._wall_start = None
+        self.now = None
+
+    def advance_to(self, timestamp: float) -> None:
+        """Move the clock to timestamp, sleeping if running ahead of speed."""
+        if self._start is None:
+            self._start = timestamp
+            self._wall_start = time.monotonic()
+        if self.now is None or timestamp > self.now:
+            self.now = timestamp
+        if self._speed > 0:
+            due = self._wall_start + (timestamp - self._start) / self._speed
+            if (delay := due - time.monotonic()) > 0:
+                time.sleep(delay)
+
+
+def _parse_timestamp(value) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _parse_value(value) -> float | None:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _pick_column(columns, candidates, path: str) -> str:
+    for column in candidates:
+        if column in columns:
+            return column
+    raise SystemExit(f"{path}: no column named any of {', '.join(candidates)}")
+
+
+def _read_csv(path: str) -> Iterator[tuple[float, object]]:
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.DictReader(file)
+        timestamp_column = _pick_column(reader.fieldnames, TIMESTAMP_COLUMNS, path)
+        value_column = _pick_column(reader.fieldnames, VALUE_COLUMNS, path)
+        for row in reader:
+            yield row[timestamp_column], row[value_column]
+
+
+def _read_parquet(path: str) -> Iterator[tuple[float, object]]:
+    try:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet as pq
+    except ImportError as err:
+        raise SystemExit(f"{path}: reading Parquet requires pyarrow") from err
+    parquet = pq.ParquetFile(path)
+    columns = parquet.schema_arrow.names
+    timestamp_column = _pick_column(columns, TIMESTAMP_COLUMNS, path)
+    value_column = _pick_column(columns, VALUE_COLUMNS, path)
+    for batch in parquet.iter_batches(columns=[timestamp_column, value_column]):
+        yield from zip(
+            batch.column(0).to_pylist(), batch.column(1).to_pylist()
+        )
+
+
+def read_trace(path: str, channel: int) -> Iterator[tuple[float, int, float]]:
+    """Stream (timestamp, channel, celsius) readings from a trace file."""
+    rows = _read_parquet(path) if path.endswith(".parquet") else _read_csv(path)
+    for timestamp, value in rows:
+        if (value := _parse_value(value)) is not None:
+            yield _parse_timestamp(timestamp), channel, value
+
+
+def read_archive(path: str) -> Iterator[tuple[float, int, float]]:
+    """Stream (timestamp, channel, celsius) readings from a sample archive."""
+    for timestamp, in_temp, out_temp in SampleArchive(path).read():
+        yield timestamp, OUT_CHANNEL, out_temp
+        yield timestamp, IN_CHANNEL, in_temp
+
+
+def replay(args: argparse.Namespace) -> None:
+    """Replay the traces and write the coefficient series."""
+    clock = SimulatedClock(args.speed)
+    series: list[tuple[float, ...]] = []
+    engine = HeatTransferEngine(
+        sample_period=args.sample_period,
+        resample_method=args.resample_method,
+        estimator=args.estimator,
+        estimator_window=args.window,
+        forgetting_factor=args.forgetting_factor,
+    )
+    engine.on_sample = lambda sample: series.append((*sample, engine.coefficient))
+    if args.archive:
+        readings = read_archive(args.archive)
+    else:
+        readings = heapq.merge(
+            read_trace(args.indoor, IN_CHANNEL),
+            read_trace(args.outdoor, OUT_CHANNEL),
+        )
+
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    writer = csv.writer(output)
+    writer.writerow(("timestamp", "indoor", "outdoor", "coefficient"))
+    count = 0
+    samples = 0
+    first = None
+    started = time.perf_counter()
+    try:
+        for timestamp, channel, value in readings:
+            clock.advance_to(timestamp)
+            if first is None:
+                first = timestamp
+            engine.add_reading(channel, timestamp, value)
+            count += 1
+            if series:
+                samples += len(series)
+                writer.writerows(series)
+                series.clear()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    simulated = (clock.now - first) if first is not None else 0.0
+    print(
+        f"{count} readings, {samples} aligned samples in {elapsed:.2f} s: "
+        f"{count / elapsed if elapsed else 0:.0f} readings/s, "
+        f"{simulated / elapsed if elapsed else 0:.0f}x real time",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the replay."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("indoor", nargs="?", help="indoor temperature trace")
+    parser.add_argument("outdoor", nargs="?", help="outdoor temperature trace")
+    parser.add_argument("--archive", help="replay a device sample archive instead")
+    parser.add_argument("--output", help="write the coefficients here, not stdout")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="multiple of real time to replay at, 0 for as fast as possible",
+    )
+    parser.add_argument(
+        "--estimator",
+        choices=[estimator.value for estimator in EstimatorType],
+        default=ESTIMATOR_DEFAULT,
+    )
+    parser.add_argument("--window", type=int, default=ESTIMATOR_WINDOW_DEFAULT)
+    parser.add_argument(
+        "--forgetting-factor", type=float, default=FORGETTING_FACTOR_DEFAULT
+    )
+    parser.add_argument(
+        "--sample-period", type=float, default=SAMPLE_PERIOD_DEFAULT
+    )
+    parser.add_argument(
+        "--resample-method",
+        choices=[method.value for method in ResampleMethod],
+        default=RESAMPLE_METHOD_DEFAULT,
+    )
+    args = parser.parse_args()
+    if not args.archive and not (args.indoor and args.outdoor):
+        parser.error("give indoor and outdoor traces or --archive")
+    replay(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""Tests for the Home Assistant free engine module.
+
+The engine is imported on its own, as scripts/replay.py does, so these tests
+run without Home Assistant installed:
+
+    python -m pytest tests
+"""
+from __future__ import annotations
+
+import math
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(__file__), "..", "custom_components", "heat_transfer"
+    ),
+)
+
+# pylint: disable=wrong-import-position
+from engine import (  # noqa: E402
+    ChangePointDetector,
+    CoefficientRanking,
+    CoolingSegmenter,
+    HeatLossIntegrator,
+    HeatTransferEngine,
+    MultivariateRecursiveLeastSquaresEstimator,
+    NewtonEstimator,
+    RecursiveLeastSquaresEstimator,
+    ResampleMethod,
+    SampleArchive,
+    StreamAligner,
+    TemperatureFusion,
+    WindowedRegressionEstimator,
+    replay_estimator,
+)
+
+COEFFICIENT = 5e-5
+OUTDOOR = 2.0
+
+
+def _cooling(samples: int, coefficient: float = COEFFICIENT, period: float = 60.0):
+    """Return aligned (timestamp, indoor, outdoor) samples of a cooling room."""
+    return [
+        (
+            index * period,
+            OUTDOOR + 18.0 * math.exp(-coefficient * index * period),
+            OUTDOOR,
+        )
+        for index in range(samples)
+    ]
+
+
+def test_aligner_interpolates_onto_grid():
+    aligner = StreamAligner(period=60)
+    assert aligner.add(0, 0, 20.0) == []
+    assert aligner.add(1, 0, 2.0) == [(0, 20.0, 2.0)]
+    assert aligner.add(0, 120, 19.0) == []
+    assert aligner.add(1, 120, 2.0) == [(60, 19.5, 2.0), (120, 19.0, 2.0)]
+
+
+def test_aligner_hold_method_holds_value():
+    aligner = StreamAligner(period=60, method=ResampleMethod.HOLD)
+    aligner.add(0, 0, 20.0)
+    aligner.add(1, 0, 2.0)
+    aligner.add(0, 120, 19.0)
+    assert aligner.add(1, 120, 2.0) == [(60, 20.0, 2.0), (120, 19.0, 2.0)]
+
+
+def test_aligner_drops_out_of_order_readings():
+    aligner = StreamAligner(period=60)
+    aligner.add(0, 60, 20.0)
+    assert aligner.add(0, 30, 21.0) == []
+    assert aligner.add(1, 60, 2.0) == [(60, 20.0, 2.0)]
+
+
+def test_aligner_holds_silent_channel():
+    aligner = StreamAligner(period=60, stale_after=600)
+    aligner.add(0, 0, 20.0)
+    aligner.add(1, 0, 2.0)
+    samples = aligner.add(1, 900, 2.0)
+    assert samples[-1] == (900, 20.0, 2.0)
+
+
+def test_aligner_keeps_grid_when_channel_goes_stale():
+    aligner = StreamAligner(period=60, stale_after=600)
+    samples = []
+    for channel, timestamp, value in (
+        (0, 0, 20.0),
+        (1, 0, 2.0),
+        (0, 50, 20.0),
+        (1, 110, 2.0),
+        (1, 710, 2.0),
+        (0, 760, 19.9),
+        (1, 770, 2.0),
+    ):
+        samples += aligner.add(channel, timestamp, value)
+    assert [sample[0] for sample in samples] == list(range(0, 721, 60))
+    assert samples[-1][1] < 20.0
+
+
+def test_aligner_resumes_after_outage():
+    aligner = StreamAligner(period=60, stale_after=600)
+    aligner.add(0, 0, 20.0)
+    aligner.add(1, 0, 2.0)
+    samples = aligner.add(0, 3600, 19.0) + aligner.add(1, 3600, 2.0)
+    assert samples[0][0] == 3000
+    assert samples[-1][0] == 3600
+
+
+def test_aligner_optional_channels_do_not_hold_back_grid():
+    aligner = StreamAligner(period=60, optional=1)
+    aligner.add(0, 0, 20.0)
+    assert aligner.add(1, 0, 2.0) == [(0, 20.0, 2.0, 0.0)]
+    aligner.add(2, 30, 100.0)
+    aligner.add(0, 60, 20.0)
+    assert aligner.add(1, 60, 2.0) == [(60, 20.0, 2.0, 100.0)]
+
+
+def test_fusion_weights_recent_reports():
+    fusion = TemperatureFusion(time_constant=300)
+    fusion.add("a", 0, 20.0)
+    assert fusion.add("b", 0, 22.0) == pytest.approx(21.0)
+    # a reported again, so it counts for more.
+    assert fusion.add("a", 300, 20.0) == pytest.approx(
+        (20.0 * math.e + 22.0) / (math.e + 1)
+    )
+
+
+def test_fusion_leaves_out_discarded_members():
+    fusion = TemperatureFusion()
+    fusion.add("a", 0, 20.0)
+    fusion.add("b", 0, 22.0)
+    fusion.discard("b")
+    assert fusion.add("a", 60, 20.5) == pytest.approx(20.5)
+    fusion.discard("a")
+    assert fusion.add("b", 120, 21.0) == pytest.approx(21.0)
+
+
+def test_fusion_survives_long_runs():
+    fusion = TemperatureFusion(time_constant=60)
+    for minute in range(100000):
+        value = fusion.add("a" if minute % 2 else "b", minute * 60.0, 20.0)
+    assert value == pytest.approx(20.0)
+
+
+def test_newton_estimator_is_abstract():
+    with pytest.raises(TypeError):
+        NewtonEstimator()  # pylint: disable=abstract-class-instantiated
+
+
+@pytest.mark.parametrize(
+    "estimator",
+    [
+        WindowedRegressionEstimator(60),
+        RecursiveLeastSquaresEstimator(0.99),
+        MultivariateRecursiveLeastSquaresEstimator(0.99),
+    ],
+)
+def test_estimators_fit_cooling_coefficient(estimator):
+    replay_estimator(estimator, _cooling(240))
+    assert estimator.value == pytest.approx(COEFFICIENT, rel=1e-3)
+
+
+def test_estimator_update_returns_sample_coefficient():
+    estimator = RecursiveLeastSquaresEstimator()
+    samples = _cooling(2)
+    assert estimator.update(*samples[0]) is None
+    assert estimator.update(*samples[1]) == pytest.approx(COEFFICIENT, rel=1e-2)
+
+
+def test_regression_window_forgets_old_samples():
+    estimator = WindowedRegressionEstimator(30)
+    replay_estimator(estimator, _cooling(100, 1e-4))
+    estimator.start_segment()
+    replay_estimator(estimator, _cooling(100))
+    assert estimator.value == pytest.approx(COEFFICIENT, rel=1e-3)
+
+
+def test_start_segment_skips_the_gap():
+    estimator = RecursiveLeastSquaresEstimator()
+    estimator.update(0, 20.0, 2.0)
+    estimator.start_segment()
+    assert estimator.update(86400, 10.0, 2.0) is None
+    assert estimator.value is None
+
+
+def test_multivariate_separates_solar_gain():
+    estimator = MultivariateRecursiveLeastSquaresEstimator(1.0, irradiance=True)
+    indoor = 20.0
+    gain = 2e-6
+    for minute in range(600):
+        irradiance = 200.0 * (1 + math.sin(minute / 30))
+        estimator.update(minute * 60.0, indoor, OUTDOOR, irradiance)
+        indoor += 60 * (COEFFICIENT * (OUTDOOR - indoor) + gain * irradiance)
+    assert estimator.value == pytest.approx(COEFFICIENT, rel=0.05)
+
+
+def test_change_point_detector_ignores_steady_stream():
+    detector = ChangePointDetector()
+    assert not any(detector.update(1.0 + 0.01 * math.sin(i)) for i in range(1000))
+
+
+def test_change_point_detector_finds_step():
+    detector = ChangePointDetector()
+    for index in range(300):
+        assert detector.update(1.0 + 0.01 * math.sin(index)) == 0
+    directions = [detector.update(2.0) for _ in range(20)]
+    assert 1 in directions
+
+
+def test_change_point_detector_ignores_lone_outlier():
+    detector = ChangePointDetector()
+    for index in range(300):
+        detector.update(1.0 + 0.01 * math.sin(index))
+    assert detector.update(100.0) == 0
+
+
+def _on_change_night(coefficient: float, step: float | None = None):
+    """Return (channel, timestamp, value) readings of a cooling night.
+
+    The indoor sensor looks at irregular intervals and reports its value
+    rounded to 0.1 K only when that changed, the outdoor one every 5 minutes.
+    From 5 hours on the coefficient is step.
+    """
+    rng = random.Random(0)
+    readings = [(1, float(timestamp), OUTDOOR) for timestamp in range(0, 36001, 300)]
+    timestamp, indoor, reported = 0.0, 20.0, None
+    while timestamp <= 36000:
+        if round(indoor, 1) != reported:
+            reported = round(indoor, 1)
+            readings.append((0, timestamp, reported))
+        interval = rng.uniform(20, 100)
+        rate = step if step and timestamp >= 18000 else coefficient
+        indoor += (OUTDOOR - indoor) * (1 - math.exp(-rate * interval))
+        timestamp += interval
+    return sorted(readings, key=lambda reading: reading[1])
+
+
+def _change_points(estimator: str, readings) -> list[tuple[str, int, float]]:
+    found = []
+    engine = HeatTransferEngine(
+        estimator=estimator,
+        change_detection=True,
+        on_change_point=lambda stream, direction, sample: found.append(
+            (stream, direction, sample[0])
+        ),
+    )
+    for channel, timestamp, value in readings:
+        engine.add_reading(channel, timestamp, value)
+    return found
+
+
+@pytest.mark.parametrize("estimator", ["regression", "rls", "multivariate_rls"])
+@pytest.mark.parametrize("coefficient", [1e-5, 5e-5])
+def test_no_change_point_on_steady_night_with_on_change_sensor(
+    estimator, coefficient
+):
+    assert _change_points(estimator, _on_change_night(coefficient)) == []
+
+
+@pytest.mark.parametrize("coefficient", [1e-5, 5e-5])
+def test_change_point_on_step_with_on_change_sensor(coefficient):
+    found = _change_points("rls", _on_change_night(coefficient, 3 * coefficient))
+    assert [direction for _, direction, timestamp in found if timestamp > 18000] == [1]
+    assert 18000 < found[0][2] <= 18000 + 3600
+
+
+def test_on_change_sensor_fit_is_unbiased():
+    engine = HeatTransferEngine(estimator="rls")
+    for channel, timestamp, value in _on_change_night(1e-5):
+        engine.add_reading(channel, timestamp, value)
+    assert engine.coefficient == pytest.approx(1e-5, rel=0.05)
+
+
+def test_segmenter_keeps_cooling_periods_only():
+    segmenter = CoolingSegmenter(settle=120, max_samples=100)
+    assert segmenter.add((0, 20.0, 2.0)) is None
+    segmenter.set_heating(0, False)
+    for sample in _cooling(10):
+        segmenter.add(sample)
+    segment = segmenter.set_heating(600, True)
+    assert [sample[0] for sample in segment] == [120, 180, 240, 300, 360, 420, 480, 540]
+
+
+def test_archive_round_trip(tmp_path):
+    archive = SampleArchive(str(tmp_path / "heat_transfer" / "room.bin"))
+    for sample in _cooling(10):
+        archive.append(sample)
+    archive.write(archive.take_batch())
+    assert archive.tail(3) == _cooling(10)[-3:]
+    assert [sample[0] for sample in archive.read(120, 300)] == [120, 180, 240]
+
+
+def test_archive_rotates_when_full(tmp_path):
+    path = str(tmp_path / "room.bin")
+    archive = SampleArchive(path, max_bytes=24 * 5)
+    samples = _cooling(8)
+    for batch in (samples[:4], samples[4:]):
+        for sample in batch:
+            archive.append(sample)
+        archive.write(archive.take_batch())
+    assert os.path.exists(f"{path}.1")
+    assert archive.read() == samples
+    assert archive.tail(6) == samples[2:]
+
+
+def test_archive_ignores_partial_record(tmp_path):
+    path = str(tmp_path / "room.bin")
+    archive = SampleArchive(path)
+    for sample in _cooling(3):
+        archive.append(sample)
+    archive.write(archive.take_batch())
+    with open(path, "ab") as file:
+        file.write(b"\0" * 7)
+    assert archive.read() == _cooling(3)
+
+
+def test_integrator_degree_days_and_energy():
+    integrator = HeatLossIntegrator(base_temperature=15.5, thermal_mass=1000.0)
+    integrator.update(0, 20.0, 5.5, 1e-4)
+    integrator.update(86400, 20.0, 5.5, 1e-4)
+    assert integrator.degree_days == pytest.approx(10.0)
+    # 1000 kJ/K * 1e-4 /s * 14.5 K = 1.45 kW for 24 hours.
+    assert integrator.energy == pytest.approx(1.45 * 24)
+    integrator.restore(1.0, 2.0)
+    assert integrator.degree_days == pytest.approx(11.0)
+
+
+def test_integrator_without_thermal_mass_has_no_energy():
+    integrator = HeatLossIntegrator(thermal_mass=0.0)
+    integrator.update(0, 20.0, 25.0, 1e-4)
+    integrator.update(3600, 20.0, 25.0, 1e-4)
+    assert integrator.degree_days == 0.0
+    assert integrator.energy is None
+
+
+def test_ranking_top_follows_updates():
+    ranking = CoefficientRanking()
+    for key, value in (("a", 1.0), ("b", 3.0), ("c", 2.0)):
+        ranking.update(key, value)
+    assert ranking.top(2) == [("b", 3.0), ("c", 2.0)]
+    ranking.update("a", 4.0)
+    ranking.update("b", None)
+    assert ranking.top(5) == [("a", 4.0), ("c", 2.0)]
+
+
+def test_engine_bootstrap_starts_a_new_segment():
+    engine = HeatTransferEngine(estimator="rls")
+    estimator = replay_estimator(engine.estimator, _cooling(100))
+    engine.bootstrap(estimator)
+    value = engine.coefficient
+    # A reading a day later must not be differenced against the archive.
+    engine.add_reading(0, 86400.0, 5.0)
+    engine.add_reading(1, 86400.0, OUTDOOR)
+    assert engine.coefficient == value